@@ -0,0 +1,46 @@
+"""Add keyset pagination indexes
+
+Revision ID: 256ee4cc9ac1
+Revises: 8419322584b4
+Create Date: 2026-10-18 16:10:12.401553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '256ee4cc9ac1'
+down_revision: Union[str, Sequence[str], None] = '8419322584b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Owner listings: WHERE created_by = :uid AND id < :cursor ORDER BY id DESC
+    op.create_index("ix_recipes_created_by_id", "recipes", ["created_by", "id"])
+    # Covered by the composite index above
+    op.drop_index("ix_recipes_created_by", table_name="recipes")
+
+    # Public feed: WHERE is_public [AND cuisine = :c] AND id < :cursor ORDER BY id DESC
+    op.create_index(
+        "ix_recipes_public_id",
+        "recipes",
+        ["id"],
+        postgresql_where=sa.text("is_public IS TRUE"),
+    )
+    op.create_index(
+        "ix_recipes_public_cuisine_id",
+        "recipes",
+        ["cuisine", "id"],
+        postgresql_where=sa.text("is_public IS TRUE"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_recipes_public_cuisine_id", table_name="recipes")
+    op.drop_index("ix_recipes_public_id", table_name="recipes")
+    op.create_index("ix_recipes_created_by", "recipes", ["created_by"])
+    op.drop_index("ix_recipes_created_by_id", table_name="recipes")
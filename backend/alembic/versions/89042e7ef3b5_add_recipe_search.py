@@ -0,0 +1,75 @@
+"""Add recipe full-text search
+
+Revision ID: 89042e7ef3b5
+Revises: 256ee4cc9ac1
+Create Date: 2026-10-18 16:31:47.118602
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89042e7ef3b5'
+down_revision: Union[str, Sequence[str], None] = '256ee4cc9ac1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    if op.get_context().dialect.name == "sqlite":
+        # Local/test databases: FTS5 index kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+            "title, cuisine, description, "
+            "content='recipes', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+            "INSERT INTO recipes_fts(rowid, title, cuisine, description) "
+            "VALUES (new.id, new.title, new.cuisine, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title, cuisine, description) "
+            "VALUES ('delete', old.id, old.title, old.cuisine, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_au AFTER UPDATE OF title, cuisine, description ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title, cuisine, description) "
+            "VALUES ('delete', old.id, old.title, old.cuisine, old.description); "
+            "INSERT INTO recipes_fts(rowid, title, cuisine, description) "
+            "VALUES (new.id, new.title, new.cuisine, new.description); END"
+        )
+        op.execute("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')")
+        return
+
+    # Generated column: Postgres recomputes it on every INSERT/UPDATE
+    op.execute(
+        "ALTER TABLE recipes ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(cuisine, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+        ") STORED"
+    )
+    op.create_index(
+        "ix_recipes_search_vector",
+        "recipes",
+        [sa.text("search_vector")],
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    if op.get_context().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_ai")
+        op.execute("DROP TABLE IF EXISTS recipes_fts")
+        return
+
+    op.drop_index("ix_recipes_search_vector", table_name="recipes")
+    op.drop_column("recipes", "search_vector")
@@ -0,0 +1,55 @@
+"""Add background jobs table
+
+Revision ID: a7c3e9f1d5b2
+Revises: f4b8d2e6a3c7
+Create Date: 2026-10-18 18:20:47.162903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1d5b2'
+down_revision: Union[str, Sequence[str], None] = 'f4b8d2e6a3c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+QUEUED = "status = 'queued'"
+
+
+def upgrade():
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("locked_by", sa.String(length=100), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jobs_status_run_at", "jobs", ["status", "run_at"])
+    op.create_index(
+        "uq_jobs_queued_key",
+        "jobs",
+        ["idempotency_key"],
+        unique=True,
+        postgresql_where=sa.text(QUEUED),
+        sqlite_where=sa.text(QUEUED),
+    )
+
+
+def downgrade():
+    op.drop_index("uq_jobs_queued_key", table_name="jobs")
+    op.drop_index("ix_jobs_status_run_at", table_name="jobs")
+    op.drop_table("jobs")
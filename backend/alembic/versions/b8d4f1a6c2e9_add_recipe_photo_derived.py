@@ -0,0 +1,31 @@
+"""Add recipes.photo_derived
+
+Revision ID: b8d4f1a6c2e9
+Revises: a7c3e9f1d5b2
+Create Date: 2026-10-18 19:05:26.518342
+
+Existing photos start out without variants in responses; run
+``python -m app.services.images backfill`` to generate and flag them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f1a6c2e9'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e9f1d5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column(
+        "recipes",
+        sa.Column("photo_derived", sa.Boolean(), server_default=sa.text("false"), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("recipes", "photo_derived")
@@ -0,0 +1,79 @@
+"""Add recipes.updated_at
+
+Revision ID: c3d91f0a7e52
+Revises: 89042e7ef3b5
+Create Date: 2026-10-18 17:05:12.403391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d91f0a7e52'
+down_revision: Union[str, Sequence[str], None] = '89042e7ef3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _public_id_index(columns):
+    op.create_index(
+        "ix_recipes_public_id",
+        "recipes",
+        columns,
+        postgresql_where=sa.text("is_public IS TRUE"),
+        sqlite_where=sa.text("is_public IS 1"),
+    )
+
+
+def _tighten_sqlite():
+    # SQLite can't ALTER COLUMN, so batch mode rebuilds the table. That
+    # drops its triggers (the search ones) and may lose partial indexes'
+    # WHERE clauses, so their DDL is saved and replayed around it.
+    saved = op.get_bind().execute(sa.text(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name = 'recipes' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )).all()
+    for type_, name, _ in saved:
+        op.execute(f'DROP {type_.upper()} "{name}"')
+    with op.batch_alter_table("recipes") as batch:
+        batch.alter_column(
+            "updated_at",
+            existing_type=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        )
+    for _, _, sql in saved:
+        op.execute(sql)
+
+
+def upgrade():
+    # Rebuilt below to cover the feed's count/max(updated_at) probe
+    op.drop_index("ix_recipes_public_id", table_name="recipes")
+
+    if op.get_context().dialect.name == "sqlite":
+        # SQLite cannot ADD COLUMN with a non-constant default
+        op.add_column("recipes", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+        op.execute("UPDATE recipes SET updated_at = coalesce(created_at, CURRENT_TIMESTAMP)")
+        _tighten_sqlite()
+    else:
+        # now() is stable, so Postgres fills existing rows without a table rewrite
+        op.add_column(
+            "recipes",
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+
+    _public_id_index(["id", "updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_recipes_public_id", table_name="recipes")
+    _public_id_index(["id"])
+    op.drop_column("recipes", "updated_at")
@@ -0,0 +1,109 @@
+"""Add trigger-maintained recipe facet counts
+
+Revision ID: d6a1e4b2c9f3
+Revises: c3d91f0a7e52
+Create Date: 2026-10-18 17:05:12.418330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a1e4b2c9f3'
+down_revision: Union[str, Sequence[str], None] = 'c3d91f0a7e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYS = "cuisine, difficulty, rating, cook_bucket, calorie_bucket, protein_bucket"
+WATCHED = "is_public, cuisine, difficulty, rating, cook_time, calories, protein_g"
+
+
+def _bucket(column, edges, op_):
+    whens = " ".join(f"WHEN {column} {op_} {edge} THEN {i}" for i, edge in enumerate(edges))
+    return f"CASE WHEN {column} IS NULL THEN -1 {whens} ELSE {len(edges)} END"
+
+
+def _cell(row):
+    return ", ".join([
+        f"coalesce({row}.cuisine, '')",
+        f"coalesce({row}.difficulty, '')",
+        f"coalesce({row}.rating, -1)",
+        _bucket(f"{row}.cook_time", (15, 30, 45, 60, 90, 120), "<="),
+        _bucket(f"{row}.calories", (300, 500, 700, 1000), "<="),
+        _bucket(f"{row}.protein_g", (10, 20, 30, 40), "<"),
+    ])
+
+
+def _decrement(row, condition=""):
+    return (
+        f"UPDATE recipe_facets SET recipe_count = recipe_count - 1 "
+        f"WHERE {condition}({KEYS}) = ({_cell(row)})"
+    )
+
+
+def _increment(row, condition="true"):
+    return (
+        f"INSERT INTO recipe_facets ({KEYS}, recipe_count) SELECT {_cell(row)}, 1 WHERE {condition} "
+        f"ON CONFLICT ({KEYS}) DO UPDATE SET recipe_count = recipe_facets.recipe_count + 1"
+    )
+
+
+def upgrade():
+    op.create_table(
+        "recipe_facets",
+        sa.Column("cuisine", sa.String(length=80), nullable=False),
+        sa.Column("difficulty", sa.String(length=20), nullable=False),
+        sa.Column("rating", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("cook_bucket", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("calorie_bucket", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("protein_bucket", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("recipe_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "cuisine", "difficulty", "rating", "cook_bucket", "calorie_bucket", "protein_bucket"
+        ),
+    )
+
+    if op.get_context().dialect.name == "sqlite":
+        op.execute(
+            f"CREATE TRIGGER recipe_facets_ai AFTER INSERT ON recipes WHEN new.is_public BEGIN "
+            f"{_increment('new')}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER recipe_facets_ad AFTER DELETE ON recipes WHEN old.is_public BEGIN "
+            f"{_decrement('old')}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER recipe_facets_au AFTER UPDATE OF {WATCHED} ON recipes BEGIN "
+            f"{_decrement('old', 'old.is_public AND ')}; {_increment('new', 'new.is_public')}; END"
+        )
+    else:
+        op.execute(
+            "CREATE FUNCTION recipe_facets_sync() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+            f"IF TG_OP <> 'INSERT' AND OLD.is_public THEN {_decrement('OLD')}; END IF; "
+            f"IF TG_OP <> 'DELETE' AND NEW.is_public THEN {_increment('NEW')}; END IF; "
+            "RETURN NULL; END $$"
+        )
+        op.execute(
+            f"CREATE TRIGGER recipe_facets_sync AFTER INSERT OR DELETE OR UPDATE OF {WATCHED} "
+            "ON recipes FOR EACH ROW EXECUTE FUNCTION recipe_facets_sync()"
+        )
+
+    # Backfill
+    op.execute(
+        f"INSERT INTO recipe_facets ({KEYS}, recipe_count) "
+        f"SELECT {_cell('recipes')}, count(*) FROM recipes WHERE is_public GROUP BY 1, 2, 3, 4, 5, 6"
+    )
+
+
+def downgrade():
+    if op.get_context().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS recipe_facets_au")
+        op.execute("DROP TRIGGER IF EXISTS recipe_facets_ad")
+        op.execute("DROP TRIGGER IF EXISTS recipe_facets_ai")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS recipe_facets_sync ON recipes")
+        op.execute("DROP FUNCTION IF EXISTS recipe_facets_sync()")
+    op.drop_table("recipe_facets")
@@ -0,0 +1,25 @@
+"""Index recipes.updated_at
+
+Revision ID: e2f7c5a9b1d4
+Revises: d6a1e4b2c9f3
+Create Date: 2026-10-18 17:05:12.431207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f7c5a9b1d4'
+down_revision: Union[str, Sequence[str], None] = 'd6a1e4b2c9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index("ix_recipes_updated_at", "recipes", ["updated_at"])
+
+
+def downgrade():
+    op.drop_index("ix_recipes_updated_at", table_name="recipes")
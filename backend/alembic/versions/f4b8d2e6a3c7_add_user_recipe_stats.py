@@ -0,0 +1,111 @@
+"""Add trigger-maintained per-user recipe stats
+
+Revision ID: f4b8d2e6a3c7
+Revises: e2f7c5a9b1d4
+Create Date: 2026-10-18 17:42:36.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2e6a3c7'
+down_revision: Union[str, Sequence[str], None] = 'e2f7c5a9b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYS = "user_id, cuisine, difficulty, rating"
+MACROS = ("calories", "protein_g", "carbs_g", "fat_g")
+WATCHED = "created_by, is_public, cuisine, difficulty, rating, calories, protein_g, carbs_g, fat_g"
+
+
+def _cell(row):
+    return f"{row}.created_by, coalesce({row}.cuisine, ''), coalesce({row}.difficulty, ''), coalesce({row}.rating, -1)"
+
+
+def _deltas(row):
+    deltas = {"recipe_count": "1", "public_count": f"CASE WHEN {row}.is_public THEN 1 ELSE 0 END"}
+    for macro in MACROS:
+        deltas[f"{macro}_sum"] = f"coalesce({row}.{macro}, 0)"
+        deltas[f"{macro}_count"] = f"CASE WHEN {row}.{macro} IS NULL THEN 0 ELSE 1 END"
+    return deltas
+
+
+COUNTERS = tuple(_deltas("new"))
+COLUMNS = ", ".join((KEYS, *COUNTERS))
+
+
+def _decrement(row):
+    sets = ", ".join(f"{name} = {name} - {delta}" for name, delta in _deltas(row).items())
+    return f"UPDATE user_recipe_stats SET {sets} WHERE ({KEYS}) = ({_cell(row)})"
+
+
+def _increment(row):
+    sets = ", ".join(f"{name} = user_recipe_stats.{name} + excluded.{name}" for name in COUNTERS)
+    return (
+        f"INSERT INTO user_recipe_stats ({COLUMNS}) SELECT {_cell(row)}, {', '.join(_deltas(row).values())} "
+        f"WHERE true ON CONFLICT ({KEYS}) DO UPDATE SET {sets}"
+    )
+
+
+def upgrade():
+    op.create_table(
+        "user_recipe_stats",
+        sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("cuisine", sa.String(length=80), nullable=False),
+        sa.Column("difficulty", sa.String(length=20), nullable=False),
+        sa.Column("rating", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("recipe_count", sa.Integer(), nullable=False),
+        sa.Column("public_count", sa.Integer(), nullable=False),
+        *(
+            column
+            for macro in MACROS
+            for column in (
+                sa.Column(f"{macro}_sum", sa.BigInteger(), nullable=False),
+                sa.Column(f"{macro}_count", sa.Integer(), nullable=False),
+            )
+        ),
+        sa.PrimaryKeyConstraint("user_id", "cuisine", "difficulty", "rating"),
+    )
+
+    if op.get_context().dialect.name == "sqlite":
+        op.execute(f"CREATE TRIGGER user_recipe_stats_ai AFTER INSERT ON recipes BEGIN {_increment('new')}; END")
+        op.execute(f"CREATE TRIGGER user_recipe_stats_ad AFTER DELETE ON recipes BEGIN {_decrement('old')}; END")
+        op.execute(
+            f"CREATE TRIGGER user_recipe_stats_au AFTER UPDATE OF {WATCHED} ON recipes BEGIN "
+            f"{_decrement('old')}; {_increment('new')}; END"
+        )
+    else:
+        op.execute(
+            "CREATE FUNCTION user_recipe_stats_sync() RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+            f"IF TG_OP <> 'INSERT' THEN {_decrement('OLD')}; END IF; "
+            f"IF TG_OP <> 'DELETE' THEN {_increment('NEW')}; END IF; "
+            "RETURN NULL; END $$"
+        )
+        op.execute(
+            f"CREATE TRIGGER user_recipe_stats_sync AFTER INSERT OR DELETE OR UPDATE OF {WATCHED} "
+            "ON recipes FOR EACH ROW EXECUTE FUNCTION user_recipe_stats_sync()"
+        )
+
+    # Backfill
+    aggregates = ["count(*)", "sum(CASE WHEN is_public THEN 1 ELSE 0 END)"]
+    for macro in MACROS:
+        aggregates += [f"coalesce(sum({macro}), 0)", f"count({macro})"]
+    op.execute(
+        f"INSERT INTO user_recipe_stats ({COLUMNS}) "
+        f"SELECT {_cell('recipes')}, {', '.join(aggregates)} FROM recipes GROUP BY 1, 2, 3, 4"
+    )
+
+
+def downgrade():
+    if op.get_context().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS user_recipe_stats_au")
+        op.execute("DROP TRIGGER IF EXISTS user_recipe_stats_ad")
+        op.execute("DROP TRIGGER IF EXISTS user_recipe_stats_ai")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS user_recipe_stats_sync ON recipes")
+        op.execute("DROP FUNCTION IF EXISTS user_recipe_stats_sync()")
+    op.drop_table("user_recipe_stats")
@@ -0,0 +1,74 @@
+"""ETag / Last-Modified validators and conditional GET handling.
+
+Validators are derived from ``updated_at`` (and, for pages, the row count),
+never from the rendered body, so a matching ``If-None-Match`` is answered
+with 304 before anything is serialized. Pages get an ETag only: their
+max(updated_at) stays put when a row is deleted or unpublished, so it can't
+serve as a Last-Modified. Comparison is weak (RFC 9110
+13.1.2) because the compression middleware weakens tags on encoded bodies.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.responses import Response
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    # SQLite hands timezone-aware columns back naive; they are stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def recipe_etag(recipe_id: int, updated_at: datetime) -> str:
+    return f'"r{recipe_id}-{int(_utc(updated_at).timestamp() * 1_000_000):x}"'
+
+
+def page_etag(key: tuple, total: int, last_modified: datetime | None) -> str:
+    """Tag for a list page: its normalized query plus the count/max(updated_at) probe."""
+    stamp = _utc(last_modified).isoformat() if last_modified else ""
+    digest = hashlib.sha1(repr((key, total, stamp)).encode()).hexdigest()[:20]
+    return f'"p{digest}"'
+
+
+def page_validators(key: tuple, total: int, last_modified: datetime | None, cache_control: str) -> dict:
+    return validator_headers(page_etag(key, total, last_modified), None, cache_control)
+
+
+def validator_headers(etag: str, last_modified: datetime | None, cache_control: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request_headers, etag: str, last_modified: datetime | None = None) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(t) for t in if_none_match.split(",")}
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+    return False
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def recipe_validators(recipe) -> dict:
+    return validator_headers(recipe_etag(recipe.id, recipe.updated_at), recipe.updated_at, "private, no-cache")
@@ -1,4 +1,5 @@
 from pathlib import Path
+import tempfile
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).resolve().parents[2]  # backend/
@@ -11,8 +12,35 @@ class Settings(BaseSettings):
 
     ENV: str = "dev"
     DATABASE_URL: str
+    # Serve the API from async routes on an AsyncEngine (asyncpg/aiosqlite)
+    DB_ASYNC: bool = False
+    # Sync routes hold their pooled connection until get_db's teardown gets
+    # a threadpool slot, so size pool_size + max_overflow for peak concurrency
+    # or requests can starve each other until the pool timeout.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Comma-separated URLs of read replicas for the read-only routes; empty = primary only
+    DATABASE_REPLICA_URLS: str = ""
+    # After a write, the writer's reads stay on the primary this long
+    REPLICA_STICKY_SECONDS: float = 5.0
+    # A replica that fails to connect is skipped this long
+    REPLICA_RETRY_SECONDS: float = 10.0
     JWT_SECRET: str = "dev_secret"
     JWT_ALG: str = "HS256"
+    # Opt-in: routes that only need the caller's id take it from the verified
+    # token instead of loading the user; a deleted user's token then keeps
+    # working until it expires.
+    AUTH_TRUST_TOKEN_SUB: bool = False
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 300.0
+
+    # Argon2 cost; stored hashes with other parameters are upgraded on login
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    HASH_EXECUTOR: str = "thread"  # or "process"
+    HASH_WORKERS: int = 4
+    HASH_QUEUE_DEPTH: int = 32
 
     API_TITLE: str = "BiteBoxd API"
     API_VERSION: str = "0.1.0"
@@ -20,5 +48,69 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    # "memory" (per process) or "sqlite" (shared by all workers on the host)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = str(Path(tempfile.gettempdir()) / "biteboxd-ratelimit.sqlite")
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Comma-separated "METHOD /path/glob=cost"; unmatched requests cost 1
+    RATE_LIMIT_ROUTE_COSTS: str = (
+        "OPTIONS *=0,POST /auth/login=5,POST /auth/register=5,POST /recipes/*/photo=5,POST /recipes/bulk=10"
+    )
+
+    METRICS_ENABLED: bool = True
+
+    # Debug-only SQL profiler, see app/db/profiler.py
+    SQL_PROFILE_ENABLED: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_EXPLAIN_SLOW: bool = True
+    SQL_N_PLUS_ONE_THRESHOLD: int = 3
+
+    COMPRESSION_ENABLED: bool = True
+    # Bodies smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    # Server preference, best first; codecs whose package is missing are skipped
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+    BULK_MAX_ROWS: int = 10_000
+    BULK_MAX_BYTES: int = 16 * 1024 * 1024
+    # ids per GET /recipes?ids= and PATCH/DELETE /recipes/batch request
+    RECIPE_BATCH_MAX_IDS: int = 500
+
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_MAX_ENTRIES: int = 512
+    FEED_CACHE_TTL_SECONDS: float = 30.0
+
+    # In-memory recipe indexes, see app/services/recipe_index.py
+    RECIPE_INDEX_REFRESH_SECONDS: float = 30.0
+    RECIPE_INDEX_REBUILD_SECONDS: float = 6 * 3600.0
+    # catch-ups re-read this far behind the watermark (clock skew, and long
+    # write transactions where the database can't tell, i.e. SQLite)
+    RECIPE_INDEX_OVERLAP_SECONDS: float = 60.0
+    # /feed/{id}/similar; each worker holds public recipes x
+    # (SIMILAR_TEXT_DIMS + 39) float32s
+    SIMILAR_ENABLED: bool = True
+    SIMILAR_TEXT_DIMS: int = 96
+    # /feed/macro-match; 24 bytes per public recipe per worker
+    MACRO_MATCH_ENABLED: bool = True
+
+    # Background jobs, see app/services/jobs.py. 0 workers leaves the queue
+    # to a separate `python -m app.services.jobs` process.
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 5
+    # retry n waits about JOB_BACKOFF_SECONDS * 2**(n-1), up to the max
+    JOB_BACKOFF_SECONDS: float = 5.0
+    JOB_BACKOFF_MAX_SECONDS: float = 900.0
+    # a running job not finished in this long is taken over by another worker
+    JOB_LEASE_SECONDS: float = 600.0
+    JOB_RETENTION_SECONDS: float = 7 * 24 * 3600.0
+    # Deleting uploads no recipe references, see app/services/orphans.py
+    UPLOAD_SWEEP_SECONDS: float = 3600.0
+    UPLOAD_SWEEP_GRACE_SECONDS: float = 3600.0
 
 settings = Settings()
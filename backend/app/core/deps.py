@@ -1,10 +1,17 @@
-from fastapi import Depends, HTTPException
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt, JWTError
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import os
 
-from app.db.database import get_db
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import get_async_db, get_db, read_session, read_session_async
+from app.db.replicas import SAFE_METHODS, is_sticky, mark_write
 from app.models.models import User
 
 security = HTTPBearer()
@@ -13,10 +20,28 @@ JWT_SECRET = os.getenv("JWT_SECRET", "dev_secret")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user, detached from any session so it can be cached."""
+    id: int
+    username: str
+    email: str
+
+
+# user id -> Principal; entries are dropped when the users row changes
+user_cache = TTLCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.pop(target.id)
+
+
+def token_user_id(creds: HTTPAuthorizationCredentials) -> int:
     token = creds.credentials
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
@@ -25,9 +50,102 @@ def get_current_user(
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return int(user_id)
+
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+def _principal(user: User | None) -> Principal:
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    principal = Principal(id=user.id, username=user.username, email=user.email)
+    user_cache.set(principal.id, principal)
+    return principal
+
+
+def get_current_user(
+    creds: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    user_id = token_user_id(creds)
+
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    return _principal(db.query(User).filter(User.id == user_id).first())
+
+
+def bearer_user_id(request: Request) -> int | None:
+    """The id in a valid bearer token, or None; for routes where auth is optional."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return token_user_id(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+    except HTTPException:
+        return None
+
+
+def _note_write(request: Request, db, user_id: int) -> int:
+    # The route shares this session; _stamp_writer() pins the user to the
+    # primary once it commits (app/db/replicas.py).
+    if request.method not in SAFE_METHODS:
+        db.info["writer"] = user_id
+    return user_id
+
+
+@event.listens_for(Session, "after_commit")
+def _stamp_writer(session):
+    # stamped after the commit, so the sticky window covers the replication lag
+    writer = session.info.get("writer")
+    if writer is not None:
+        mark_write(writer)
+
+
+def get_current_user_id(
+    request: Request,
+    creds: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> int:
+    """For routes that only need the caller's id.
+
+    With AUTH_TRUST_TOKEN_SUB the verified ``sub`` claim is used as is and
+    no users lookup happens; otherwise this goes through the user cache.
+    """
+    if settings.AUTH_TRUST_TOKEN_SUB:
+        return _note_write(request, db, token_user_id(creds))
+    return _note_write(request, db, get_current_user(creds, db).id)
+
+
+def get_read_db(user_id: int = Depends(get_current_user_id)):
+    """Replica session for the caller's own read-only routes."""
+    yield from read_session(primary=is_sticky(user_id))
+
+
+async def get_current_user_async(
+    creds: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    user_id = token_user_id(creds)
+
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    return _principal(
+        (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    )
+
+
+async def get_current_user_id_async(
+    request: Request,
+    creds: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> int:
+    if settings.AUTH_TRUST_TOKEN_SUB:
+        return _note_write(request, db, token_user_id(creds))
+    return _note_write(request, db, (await get_current_user_async(creds, db)).id)
+
 
-    return user
+async def get_read_db_async(user_id: int = Depends(get_current_user_id_async)):
+    async for db in read_session_async(primary=is_sticky(user_id)):
+        yield db
@@ -7,6 +7,7 @@ def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": {"message": exc.detail, "type": "http_error"}},
+        headers=getattr(exc, "headers", None),
     )
 
 def validation_exception_handler(request: Request, exc: RequestValidationError):
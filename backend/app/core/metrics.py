@@ -0,0 +1,215 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Hot-path updates take no lock: every thread writes into its own shard
+(a dict keyed by label values) and only ``render()`` merges the shards.
+Under the GIL a shard is only ever mutated by its owning thread, and
+``dict.copy()`` is atomic, so a scrape sees a consistent-enough snapshot.
+Values that already live elsewhere (pool state) are read at scrape time.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+
+
+class _Shards:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._lock = threading.Lock()  # only taken once per thread
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            shards = list(self._shards)
+        return [s.copy() for s in shards]
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._shards = _Shards()
+        _registry.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        shard = self._shards.mine()
+        shard[label_values] = shard.get(label_values, 0.0) + amount
+
+    def _totals(self) -> dict:
+        totals = {}
+        for shard in self._shards.snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self._totals().items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_num(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Up/down counter; shards are summed, so inc/dec may happen on different threads."""
+    type = "gauge"
+
+    def dec(self, *label_values, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *label_values) -> None:
+        shard = self._shards.mine()
+        state = shard.get(label_values)
+        if state is None:
+            # one slot per bucket plus +Inf, then sum
+            state = shard[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render(self) -> list[str]:
+        merged = {}
+        for shard in self._shards.snapshot():
+            for key, state in shard.items():
+                total = merged.setdefault(key, [0] * len(state))
+                for i, v in enumerate(list(state)):
+                    total[i] += v
+        lines = self._header()
+        for key, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                lines.append(f"{self.name}_bucket{_labels((*self.labels, 'le'), (*key, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_num(state[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose value is read from ``fn()`` at scrape time."""
+    type = "gauge"
+
+    def __init__(self, name, documentation, fn):
+        super().__init__(name, documentation)
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        value = self.fn()
+        if value is None:
+            return []
+        return [*self._header(), f"{self.name} {_num(value)}"]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- Application metrics ----------
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by route template and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to the last response byte.", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.", ("method",))
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed, by route.", ("route",))
+DB_QUERY_SECONDS = Counter("db_query_seconds_total", "Time spent executing SQL, by route.", ("route",))
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests rejected with 429.")
+HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "Argon2 time per job on the hashing executor.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+JOB_RUNS = Counter("jobs_total", "Background job attempts, by kind and outcome.", ("kind", "outcome"))
+JOB_WAIT_SECONDS = Histogram(
+    "job_queue_wait_seconds",
+    "Time from a job being due to a worker starting it.",
+    ("kind",),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+JOB_SECONDS = Histogram(
+    "job_duration_seconds",
+    "Time a job ran for, failed attempts included.",
+    ("kind",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 120.0),
+)
+
+# Per-request DB totals; the middleware sets a fresh [count, seconds] list
+# and the engine events add to it (contextvars follow run_in_threadpool).
+request_db_stats: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Time every cursor execution on ``engine`` (a sync Engine)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+
+def register_pool(engine, prefix: str = "db_pool") -> None:
+    pool = engine.pool
+    for attr, doc in (
+        ("checkedout", "Connections currently checked out."),
+        ("overflow", "Connections open beyond pool_size (negative while the pool fills)."),
+        ("size", "Configured pool size."),
+    ):
+        fn = getattr(pool, attr, None)
+        if fn is not None:
+            CallbackGauge(f"{prefix}_{attr.replace('checkedout', 'checked_out')}", doc, fn)
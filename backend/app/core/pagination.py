@@ -0,0 +1,92 @@
+import base64
+import json
+import sys
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, literal, or_, select
+
+# Cursor values are bound as SQL parameters; drivers reject (500) anything
+# wider than a signed 64-bit integer or a finite double.
+MAX_CURSOR_ID = 2**63 - 1
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    key = values.get("id") if isinstance(values, dict) else None
+    if not isinstance(key, int) or isinstance(key, bool) or not -MAX_CURSOR_ID - 1 <= key <= MAX_CURSOR_ID:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def page_statement(stmt, key, limit: int, offset: int, cursor: str | None, rank=None):
+    """Order, seek and limit ``stmt`` for one page; see ``finish_page``.
+
+    With a cursor the statement seeks past the last seen key instead of
+    skipping rows, so deep pages cost the same as the first one. Plain
+    ``offset`` is kept for older clients. When ``rank`` is given (search
+    relevance) rows are ordered by ``rank desc, key desc`` and the cursor
+    carries both. One extra row is fetched to tell whether a next page exists.
+    """
+    if rank is None:
+        stmt = stmt.order_by(key.desc())
+    else:
+        stmt = stmt.add_columns(rank).order_by(rank.desc(), key.desc())
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if rank is None:
+            stmt = stmt.where(key < values["id"])
+        else:
+            last = values.get("rank")
+            # not abs(x) <= max also catches NaN and infinities
+            if not isinstance(last, (int, float)) or isinstance(last, bool) or not abs(last) <= sys.float_info.max:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            # bound with the rank's own type, so it compares like the ORDER BY
+            last = literal(float(last), rank.type)
+            stmt = stmt.where(or_(rank < last, and_(rank == last, key < values["id"])))
+    else:
+        stmt = stmt.offset(offset)
+
+    return stmt.limit(limit + 1)
+
+
+def finish_page(rows, key, limit: int, rank=None):
+    """Turn the rows of a ``page_statement`` into (items, next_cursor)."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        item = rows[-1][0]
+        values = {"id": getattr(item, key.key)}
+        if rank is not None:
+            values["rank"] = rows[-1][1]
+        next_cursor = encode_cursor(values)
+    return [row[0] for row in rows], next_cursor
+
+
+def paginate(db, stmt, key, limit: int, offset: int, cursor: str | None, rank=None):
+    """Run one page of ``stmt`` on a sync session: (items, offset, next_cursor)."""
+    if cursor:
+        offset = 0
+    rows = db.execute(page_statement(stmt, key, limit, offset, cursor, rank)).all()
+    items, next_cursor = finish_page(rows, key, limit, rank)
+    return items, offset, next_cursor
+
+
+def count_statement(stmt):
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def probe_statement(stmt, column: str = "updated_at"):
+    """(count, max(column)) over ``stmt``: enough to tell whether a page changed."""
+    sub = stmt.order_by(None).subquery()
+    return select(func.count(), func.max(sub.c[column]))
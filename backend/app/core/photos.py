@@ -0,0 +1,24 @@
+"""Where uploaded photos and their derivatives live, and the variant URLs.
+
+Shared by the storage/derivative services and the response schemas.
+"""
+UPLOAD_DIR = "uploads"
+DERIVED_URL = f"{UPLOAD_DIR}/derived"
+# name -> (box, crop to fill the box)
+VARIANTS = {
+    "thumb": ((320, 320), True),
+    "medium": ((960, 960), False),
+}
+FORMATS = ("webp", "jpg")
+
+
+def variant_urls(photo_url: str | None, derived: bool) -> dict[str, dict[str, str]] | None:
+    """thumb/medium x webp/jpg URLs, once the derivatives job has written them
+    (``recipes.photo_derived``)."""
+    # Runs for every serialized recipe, so it builds the URLs directly
+    # instead of going through images.variant_path()'s os.path calls.
+    if not photo_url or not derived:
+        return None
+    stem = photo_url.rpartition("/")[2].rpartition(".")[0] or photo_url.rpartition("/")[2]
+    prefix = f"{DERIVED_URL}/{stem[:2]}/{stem}"
+    return {variant: {fmt: f"{prefix}-{variant}.{fmt}" for fmt in FORMATS} for variant in VARIANTS}
@@ -0,0 +1,8 @@
+from starlette.responses import JSONResponse
+
+
+class JSONBytesResponse(JSONResponse):
+    """A body that is already encoded JSON, sent as is."""
+
+    def render(self, content: bytes) -> bytes:
+        return content
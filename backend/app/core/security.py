@@ -1,11 +1,23 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import asyncio
+import threading
+import time
+
+from fastapi import HTTPException
 from jose import jwt
 from passlib.context import CryptContext
 import os
 
+from app.core import metrics
+from app.core.config import settings
+
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
 )
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev_secret")
@@ -19,6 +31,63 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify, and return a fresh hash when the stored one uses outdated parameters."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# ---------- Hashing executor ----------
+# Argon2 gets its own small pool so a login burst can't occupy the threadpool
+# that serves every other request. At most HASH_WORKERS jobs run and
+# HASH_QUEUE_DEPTH wait; anything beyond that is shed with a 503.
+if settings.HASH_EXECUTOR == "process":
+    _hash_executor = ProcessPoolExecutor(max_workers=settings.HASH_WORKERS)
+else:
+    _hash_executor = ThreadPoolExecutor(max_workers=settings.HASH_WORKERS, thread_name_prefix="argon2")
+
+_hash_slots = threading.BoundedSemaphore(settings.HASH_WORKERS + settings.HASH_QUEUE_DEPTH)
+
+
+def _timed(fn, *args):
+    # Runs on the executor (possibly in another process): measure there so
+    # queueing time is not counted as hashing time.
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _record(operation: str):
+    def callback(future: Future):
+        _hash_slots.release()
+        if not future.cancelled() and future.exception() is None:
+            metrics.HASH_SECONDS.observe(future.result()[0], operation)
+    return callback
+
+
+def _submit_hash_job(fn, *args) -> Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent sign-ins, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _hash_executor.submit(_timed, fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(_record(fn.__name__))
+    return future
+
+
+async def run_hash_job_async(fn, *args):
+    """Run ``fn`` on the hashing executor without blocking the event loop.
+
+    Both route stacks await this: a sync wait would hold an anyio
+    threadpool thread per queued job and starve every other sync route.
+    """
+    return (await asyncio.wrap_future(_submit_hash_job(fn, *args)))[1]
+
 
 def create_access_token(subject: str) -> str:
     now = datetime.now(timezone.utc)
@@ -1,12 +1,24 @@
 # app/db/database.py
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+from app.core import metrics
 from app.core.config import settings
+from app.db.replicas import ReplicaSet, replica_urls
 
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
+metrics.instrument_engine(engine)
+metrics.register_pool(engine)
+if settings.SQL_PROFILE_ENABLED:
+    from app.db import profiler
+
+    profiler.instrument_engine(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -20,3 +32,131 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------- Read replicas (opt-in via DATABASE_REPLICA_URLS) ----------
+def _replica_engine(url: str):
+    replica = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    metrics.instrument_engine(replica)
+    if settings.SQL_PROFILE_ENABLED:
+        from app.db import profiler
+
+        profiler.instrument_engine(replica)
+    return replica
+
+
+replicas = ReplicaSet(
+    [_replica_engine(url) for url in replica_urls()] if not settings.DB_ASYNC else [],
+    settings.REPLICA_RETRY_SECONDS,
+)
+
+
+def read_session(primary: bool = False):
+    """Session on the next healthy replica; the primary when pinned or none is up."""
+    if not primary:
+        for replica in replicas.candidates():
+            try:
+                conn = replica.connect()
+            except DBAPIError as exc:
+                replicas.mark_down(replica, exc)
+                continue
+            db = Session(bind=conn, autoflush=False)
+            try:
+                yield db
+            finally:
+                db.close()
+                conn.close()
+            return
+    yield from get_db()
+
+
+# ---------- Async (opt-in via DB_ASYNC) ----------
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync DBAPI in ``url`` for its asyncio counterpart."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_replicas = ReplicaSet([], settings.REPLICA_RETRY_SECONDS)
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+    metrics.instrument_engine(async_engine.sync_engine)
+    metrics.register_pool(async_engine.sync_engine, prefix="db_async_pool")
+    if settings.SQL_PROFILE_ENABLED:
+        from app.db import profiler
+
+        profiler.instrument_engine(async_engine.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    def _async_replica_engine(url: str):
+        replica = create_async_engine(
+            async_database_url(url),
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+        metrics.instrument_engine(replica.sync_engine)
+        if settings.SQL_PROFILE_ENABLED:
+            from app.db import profiler
+
+            profiler.instrument_engine(replica.sync_engine)
+        return replica
+
+    async_replicas = ReplicaSet(
+        [_async_replica_engine(url) for url in replica_urls()], settings.REPLICA_RETRY_SECONDS
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def read_session_async(primary: bool = False):
+    if not primary:
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        for replica in async_replicas.candidates():
+            try:
+                conn = await replica.connect()
+            except DBAPIError as exc:
+                async_replicas.mark_down(replica, exc)
+                continue
+            try:
+                async with AsyncSession(bind=conn, autoflush=False, expire_on_commit=False) as db:
+                    yield db
+            finally:
+                await conn.close()
+            return
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,151 @@
+"""Facet counts for the public feed, kept in ``recipe_facets`` by the database.
+
+Each row counts the public recipes in one cell: cuisine x difficulty x
+rating x bucketed cook_time/calories/protein_g (NULLs stored as '' / -1 so
+the cell can be a primary key). Triggers on ``recipes`` apply +1/-1 deltas
+in the writing transaction, so every write path (ORM, bulk COPY, raw SQL)
+and every worker sees the same counts, and reading them is a scan of a
+few thousand cells instead of the recipes table. Like the search triggers,
+they are created with the table by ``create_all``; existing databases get
+them from the ``add_recipe_facets`` migration. ``rebuild()`` recomputes the
+table from scratch for backfills and drift repair:
+
+    python -m app.db.facets
+"""
+from sqlalchemy import DDL, event, literal_column, text
+
+from app.models.models import Recipe
+
+# Bucket edges. cook_time and calories buckets include their upper edge
+# (so ``max_cook_time=30`` is a whole number of buckets), protein buckets
+# their lower edge (``min_protein=30``).
+COOK_TIME_EDGES = (15, 30, 45, 60, 90, 120)
+CALORIE_EDGES = (300, 500, 700, 1000)
+PROTEIN_EDGES = (10, 20, 30, 40)
+
+CELL_COLUMNS = ("cuisine", "difficulty", "rating", "cook_bucket", "calorie_bucket", "protein_bucket")
+# Updates that touch none of these leave the counts alone
+WATCHED_COLUMNS = "is_public, cuisine, difficulty, rating, cook_time, calories, protein_g"
+
+
+def _bucket(column: str, edges: tuple, upper_inclusive: bool) -> str:
+    op = "<=" if upper_inclusive else "<"
+    whens = " ".join(f"WHEN {column} {op} {edge} THEN {i}" for i, edge in enumerate(edges))
+    return f"CASE WHEN {column} IS NULL THEN -1 {whens} ELSE {len(edges)} END"
+
+
+def cell_sql(row: str) -> list[str]:
+    """SQL for the six cell keys of ``row`` ("new", "old" or a table name)."""
+    return [
+        f"coalesce({row}.cuisine, '')",
+        f"coalesce({row}.difficulty, '')",
+        f"coalesce({row}.rating, -1)",
+        _bucket(f"{row}.cook_time", COOK_TIME_EDGES, True),
+        _bucket(f"{row}.calories", CALORIE_EDGES, True),
+        _bucket(f"{row}.protein_g", PROTEIN_EDGES, False),
+    ]
+
+
+def cell_columns():
+    """The cell keys as select-able columns over ``recipes``."""
+    return [literal_column(sql).label(name) for sql, name in zip(cell_sql("recipes"), CELL_COLUMNS)]
+
+
+_KEYS = ", ".join(CELL_COLUMNS)
+
+
+def _decrement(row: str, condition: str = "") -> str:
+    return (
+        f"UPDATE recipe_facets SET recipe_count = recipe_count - 1 "
+        f"WHERE {condition}({_KEYS}) = ({', '.join(cell_sql(row))})"
+    )
+
+
+def _increment(row: str, condition: str = "true") -> str:
+    # INSERT ... SELECT needs its WHERE for SQLite to parse the upsert
+    return (
+        f"INSERT INTO recipe_facets ({_KEYS}, recipe_count) "
+        f"SELECT {', '.join(cell_sql(row))}, 1 WHERE {condition} "
+        f"ON CONFLICT ({_KEYS}) DO UPDATE SET recipe_count = recipe_facets.recipe_count + 1"
+    )
+
+
+SQLITE_DDL = [
+    f"""
+    CREATE TRIGGER recipe_facets_ai AFTER INSERT ON recipes WHEN new.is_public BEGIN
+        {_increment("new")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipe_facets_ad AFTER DELETE ON recipes WHEN old.is_public BEGIN
+        {_decrement("old")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER recipe_facets_au AFTER UPDATE OF {WATCHED_COLUMNS} ON recipes BEGIN
+        {_decrement("old", "old.is_public AND ")};
+        {_increment("new", "new.is_public")};
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    f"""
+    CREATE FUNCTION recipe_facets_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.is_public THEN
+            {_decrement("OLD")};
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.is_public THEN
+            {_increment("NEW")};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"""
+    CREATE TRIGGER recipe_facets_sync
+    AFTER INSERT OR DELETE OR UPDATE OF {WATCHED_COLUMNS} ON recipes
+    FOR EACH ROW EXECUTE FUNCTION recipe_facets_sync()
+    """,
+]
+
+REBUILD_SQL = [
+    "DELETE FROM recipe_facets",
+    f"INSERT INTO recipe_facets ({_KEYS}, recipe_count) "
+    f"SELECT {', '.join(cell_sql('recipes'))}, count(*) FROM recipes WHERE is_public "
+    f"GROUP BY {', '.join(str(i) for i in range(1, len(CELL_COLUMNS) + 1))}",
+]
+
+# recipes' after_create: recipe_facets may not exist yet, but trigger
+# bodies are only resolved when they fire.
+for _stmt in SQLITE_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in POSTGRES_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+event.listen(
+    Recipe.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS recipe_facets_sync()").execute_if(dialect="postgresql"),
+)
+
+
+def rebuild(conn) -> None:
+    """Recompute every cell from ``recipes`` (inside the caller's transaction)."""
+    for stmt in REBUILD_SQL:
+        conn.execute(text(stmt))
+
+
+def main() -> None:
+    from app.db.database import engine
+
+    with engine.begin() as conn:
+        rebuild(conn)
+        cells, total = conn.execute(
+            text("SELECT count(*), coalesce(sum(recipe_count), 0) FROM recipe_facets")
+        ).one()
+    print(f"recipe_facets rebuilt: {cells} cells, {total} public recipes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Request-scoped SQL profiling for debugging (``SQL_PROFILE_ENABLED``).
+
+While a request is being profiled, every statement it runs is tagged
+with a ``/* request_id=... */`` comment, so it can be matched in the
+database's own logs. The id goes into the SQL text, so a client's
+``X-Request-ID`` is only used when it matches ``REQUEST_ID``. Statements
+slower than ``SQL_SLOW_QUERY_MS`` are logged with their parameters and
+the database's plan. Statement shapes that repeat
+``SQL_N_PLUS_ONE_THRESHOLD`` times or more within one request are
+reported as likely N+1 queries.
+
+This costs a comment per statement and defeats prepared-statement
+caches keyed on SQL text (asyncpg's, for instance), so keep it off in
+production.
+"""
+import contextvars
+import logging
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,?)+\)")
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+REQUEST_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+@dataclass(slots=True)
+class RequestProfile:
+    request_id: str
+    method: str
+    path: str
+    queries: int = 0
+    seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+
+current_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+def request_id(client_id: str | None) -> str:
+    """The client's id if it is safe to put in a SQL comment, else a new one."""
+    if client_id and REQUEST_ID.fullmatch(client_id):
+        return client_id
+    return uuid.uuid4().hex[:16]
+
+
+def statement_shape(statement: str) -> str:
+    """Whitespace-normalized SQL with IN-lists collapsed, for N+1 grouping."""
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # A raw DBAPI cursor keeps the EXPLAIN out of the engine events.
+    explain_cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in explain_cursor.fetchall())
+    except Exception as exc:  # a plan is best effort
+        return f"<EXPLAIN failed: {exc!r}>"
+    finally:
+        explain_cursor.close()
+
+
+def instrument_engine(engine) -> None:
+    """Attach the profiler to ``engine`` (a sync Engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        if profile is None:
+            return statement, parameters
+        context._profile_start = time.perf_counter()
+        context._profile_statement = statement
+        # checked again here: this is the only thing that reaches the SQL text
+        if not REQUEST_ID.fullmatch(profile.request_id):
+            return statement, parameters
+        return f"/* request_id={profile.request_id} */ {statement}", parameters
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        start = getattr(context, "_profile_start", None)
+        if profile is None or start is None:
+            return
+        elapsed = time.perf_counter() - start
+        original = context._profile_statement
+        profile.queries += 1
+        profile.seconds += elapsed
+        profile.shapes[statement_shape(original)] += 1
+
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            plan = ""
+            if (
+                settings.SQL_EXPLAIN_SLOW
+                and not executemany
+                and original.lstrip().upper().startswith(EXPLAINABLE)
+            ):
+                plan = _explain(conn, original, parameters)
+            logger.warning(
+                "Slow query (%.1f ms) request_id=%s %s %s\n%s\nparams=%r\nplan:\n%s",
+                elapsed * 1000, profile.request_id, profile.method, profile.path,
+                original, parameters, plan,
+            )
+
+
+def report(profile: RequestProfile) -> None:
+    for shape, count in profile.shapes.items():
+        if count >= settings.SQL_N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "Possible N+1: %d x same statement in request_id=%s %s %s\n%s",
+                count, profile.request_id, profile.method, profile.path, shape,
+            )
+    logger.info(
+        "request_id=%s %s %s: %d queries, %.1f ms in the database",
+        profile.request_id, profile.method, profile.path, profile.queries, profile.seconds * 1000,
+    )
@@ -0,0 +1,70 @@
+"""Read-replica selection for read-only routes.
+
+Reads go round-robin to the replicas in ``DATABASE_REPLICA_URLS``. A
+replica that fails to hand out a connection is skipped for
+``REPLICA_RETRY_SECONDS``; with none left, reads fall back to the
+primary. A user whose write just committed is pinned to the primary
+for ``REPLICA_STICKY_SECONDS`` so they read their own writes despite
+replication lag. That pin lives in this process, so with several workers
+the window should cover the expected lag rather than rely on it.
+"""
+import itertools
+import logging
+import threading
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# user id -> True while their reads must go to the primary
+recent_writers = TTLCache(max_entries=100_000, ttl_seconds=settings.REPLICA_STICKY_SECONDS)
+
+
+def mark_write(user_id: int) -> None:
+    recent_writers.set(user_id, True)
+
+
+def is_sticky(user_id: int | None) -> bool:
+    return user_id is not None and recent_writers.get(user_id) is not None
+
+
+class ReplicaSet:
+    def __init__(self, engines: list, retry_seconds: float):
+        self.engines = list(engines)
+        self.retry_seconds = retry_seconds
+        self._down_until = [0.0] * len(self.engines)
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> list:
+        """Healthy replicas, starting at the next one in round-robin order."""
+        n = len(self.engines)
+        if not n:
+            return []
+        start = next(self._turn) % n
+        now = time.monotonic()
+        return [
+            self.engines[i % n]
+            for i in range(start, start + n)
+            if self._down_until[i % n] <= now
+        ]
+
+    def mark_down(self, engine, exc: Exception) -> None:
+        index = self.engines.index(engine)
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Replica %s unavailable, skipping it for %.0fs: %r",
+            engine.url.render_as_string(hide_password=True), self.retry_seconds, exc,
+        )
+
+
+def replica_urls() -> list[str]:
+    return [u.strip() for u in settings.DATABASE_REPLICA_URLS.split(",") if u.strip()]
@@ -0,0 +1,119 @@
+"""Full-text search over recipe title, cuisine and description.
+
+Postgres keeps a generated ``search_vector`` tsvector column behind a GIN
+index. SQLite (tests, benchmarks) uses an external-content FTS5 table that
+triggers keep in sync with ``recipes``. Both are created alongside the table
+by ``Base.metadata.create_all``; existing databases get them from the
+``add_recipe_search`` migration.
+"""
+import re
+
+from sqlalchemy import DDL, Numeric, cast, column, event, false, func, literal_column, table
+
+from app.models.models import Recipe
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE recipes ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(cuisine, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_recipes_search_vector ON recipes USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE recipes_fts USING fts5(
+        title, cuisine, description,
+        content='recipes', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER recipes_fts_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts(rowid, title, cuisine, description)
+        VALUES (new.id, new.title, new.cuisine, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_fts_ad AFTER DELETE ON recipes BEGIN
+        INSERT INTO recipes_fts(recipes_fts, rowid, title, cuisine, description)
+        VALUES ('delete', old.id, old.title, old.cuisine, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_fts_au AFTER UPDATE OF title, cuisine, description ON recipes BEGIN
+        INSERT INTO recipes_fts(recipes_fts, rowid, title, cuisine, description)
+        VALUES ('delete', old.id, old.title, old.cuisine, old.description);
+        INSERT INTO recipes_fts(rowid, title, cuisine, description)
+        VALUES (new.id, new.title, new.cuisine, new.description);
+    END
+    """,
+]
+
+for _stmt in POSTGRES_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+for _stmt in SQLITE_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(
+    Recipe.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS recipes_fts").execute_if(dialect="sqlite"),
+)
+
+# Created above rather than declared on the models; alembic/env.py keeps
+# autogenerate from dropping them.
+UNMANAGED_COLUMNS = {("recipes", "search_vector")}
+UNMANAGED_INDEXES = {"ix_recipes_search_vector"}
+UNMANAGED_TABLE_PREFIX = "recipes_fts"
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Alembic ``include_object`` hook that skips the objects above."""
+    if type_ == "column":
+        return (obj.table.name, name) not in UNMANAGED_COLUMNS
+    if type_ == "index":
+        return name not in UNMANAGED_INDEXES
+    if type_ == "table":
+        return not name.startswith(UNMANAGED_TABLE_PREFIX)
+    return True
+
+
+_recipes_fts = table("recipes_fts", column("rowid"))
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input can't reach FTS5 query syntax.
+    return " ".join(f'"{term}"' for term in _WORD.findall(q))
+
+
+def apply_search(query, q: str, dialect: str):
+    """Restrict ``query`` to recipes matching ``q``.
+
+    Returns ``(query, rank)`` where ``rank`` sorts best matches highest, or
+    ``None`` on databases without a search index.
+    """
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        vector = literal_column("recipes.search_vector")
+        # ts_rank is a float4, which the cursor's JSON round trip doesn't
+        # reproduce exactly; a fixed numeric compares tied ranks as equal.
+        rank = cast(func.ts_rank(vector, tsquery), Numeric(12, 9, asdecimal=False))
+        return query.filter(vector.op("@@")(tsquery)), rank
+
+    if dialect == "sqlite":
+        terms = _fts5_query(q)
+        if not terms:
+            return query.filter(false()), None
+        # bm25 scores better matches lower; weights follow column order.
+        rank = -func.bm25(literal_column("recipes_fts"), 10.0, 4.0, 1.0)
+        query = query.join(_recipes_fts, _recipes_fts.c.rowid == Recipe.id).filter(
+            literal_column("recipes_fts").match(terms)
+        )
+        return query, rank
+
+    return query.filter(Recipe.title.ilike(f"%{q}%")), None
+
@@ -0,0 +1,159 @@
+"""Per-user recipe statistics, kept in ``user_recipe_stats`` by the database.
+
+Each row aggregates one user's recipes in one cell: user x cuisine x
+difficulty x rating (NULLs stored as '' / -1 so the cell can be a primary
+key), with the recipe and public counts and a sum and non-NULL count per
+macro. Like ``recipe_facets`` (app/db/facets.py), triggers on ``recipes``
+apply the deltas in the writing transaction, so single writes, batch
+updates, bulk imports and raw SQL all keep it current, and ``GET
+/users/me/stats`` reads a user's few cells instead of scanning their
+recipes. Existing databases get the table and triggers from the
+``add_user_recipe_stats`` migration. ``rebuild()`` recomputes the table
+(or some users' cells) from scratch for backfills and drift repair:
+
+    python -m app.db.user_stats [user_id ...]
+"""
+import sys
+
+from sqlalchemy import DDL, bindparam, event, text
+
+from app.models.models import Recipe
+
+CELL_COLUMNS = ("user_id", "cuisine", "difficulty", "rating")
+MACROS = ("calories", "protein_g", "carbs_g", "fat_g")
+# Updates that touch none of these leave the stats alone
+WATCHED_COLUMNS = ", ".join(("created_by", "is_public", "cuisine", "difficulty", "rating", *MACROS))
+
+
+def cell_sql(row: str) -> list[str]:
+    """SQL for the four cell keys of ``row`` ("new", "old" or a table name)."""
+    return [
+        f"{row}.created_by",
+        f"coalesce({row}.cuisine, '')",
+        f"coalesce({row}.difficulty, '')",
+        f"coalesce({row}.rating, -1)",
+    ]
+
+
+def delta_sql(row: str) -> dict[str, str]:
+    """Counter column -> what one recipe ``row`` adds to it."""
+    deltas = {"recipe_count": "1", "public_count": f"CASE WHEN {row}.is_public THEN 1 ELSE 0 END"}
+    for macro in MACROS:
+        deltas[f"{macro}_sum"] = f"coalesce({row}.{macro}, 0)"
+        deltas[f"{macro}_count"] = f"CASE WHEN {row}.{macro} IS NULL THEN 0 ELSE 1 END"
+    return deltas
+
+
+COUNTERS = tuple(delta_sql("new"))
+_KEYS = ", ".join(CELL_COLUMNS)
+_COLUMNS = ", ".join((*CELL_COLUMNS, *COUNTERS))
+
+
+def _decrement(row: str) -> str:
+    sets = ", ".join(f"{name} = {name} - {delta}" for name, delta in delta_sql(row).items())
+    return f"UPDATE user_recipe_stats SET {sets} WHERE ({_KEYS}) = ({', '.join(cell_sql(row))})"
+
+
+def _increment(row: str) -> str:
+    sets = ", ".join(f"{name} = user_recipe_stats.{name} + excluded.{name}" for name in COUNTERS)
+    # INSERT ... SELECT needs its WHERE for SQLite to parse the upsert
+    return (
+        f"INSERT INTO user_recipe_stats ({_COLUMNS}) "
+        f"SELECT {', '.join(cell_sql(row) + list(delta_sql(row).values()))} WHERE true "
+        f"ON CONFLICT ({_KEYS}) DO UPDATE SET {sets}"
+    )
+
+
+SQLITE_DDL = [
+    f"""
+    CREATE TRIGGER user_recipe_stats_ai AFTER INSERT ON recipes BEGIN
+        {_increment("new")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER user_recipe_stats_ad AFTER DELETE ON recipes BEGIN
+        {_decrement("old")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER user_recipe_stats_au AFTER UPDATE OF {WATCHED_COLUMNS} ON recipes BEGIN
+        {_decrement("old")};
+        {_increment("new")};
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    f"""
+    CREATE FUNCTION user_recipe_stats_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            {_decrement("OLD")};
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            {_increment("NEW")};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"""
+    CREATE TRIGGER user_recipe_stats_sync
+    AFTER INSERT OR DELETE OR UPDATE OF {WATCHED_COLUMNS} ON recipes
+    FOR EACH ROW EXECUTE FUNCTION user_recipe_stats_sync()
+    """,
+]
+
+
+# the same counters, aggregated over ``recipes``
+AGGREGATES = {"recipe_count": "count(*)", "public_count": "sum(CASE WHEN is_public THEN 1 ELSE 0 END)"}
+for _macro in MACROS:
+    AGGREGATES[f"{_macro}_sum"] = f"coalesce(sum({_macro}), 0)"
+    AGGREGATES[f"{_macro}_count"] = f"count({_macro})"
+
+_REBUILD_INSERT = (
+    f"INSERT INTO user_recipe_stats ({_COLUMNS}) "
+    f"SELECT {', '.join(cell_sql('recipes') + [AGGREGATES[name] for name in COUNTERS])} FROM recipes "
+    "{where}"
+    f"GROUP BY {', '.join(str(i) for i in range(1, len(CELL_COLUMNS) + 1))}"
+)
+
+# recipes' after_create: user_recipe_stats may not exist yet, but trigger
+# bodies are only resolved when they fire.
+for _stmt in SQLITE_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in POSTGRES_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+event.listen(
+    Recipe.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS user_recipe_stats_sync()").execute_if(dialect="postgresql"),
+)
+
+
+def rebuild(conn, user_ids: list[int] | None = None) -> None:
+    """Recompute the cells of ``user_ids`` (default: everyone) from ``recipes``,
+    inside the caller's transaction."""
+    if user_ids is None:
+        conn.execute(text("DELETE FROM user_recipe_stats"))
+        conn.execute(text(_REBUILD_INSERT.format(where="")))
+        return
+    ids = bindparam("ids", user_ids, expanding=True)
+    conn.execute(text("DELETE FROM user_recipe_stats WHERE user_id IN :ids").bindparams(ids))
+    conn.execute(text(_REBUILD_INSERT.format(where="WHERE created_by IN :ids ")).bindparams(ids))
+
+
+def main() -> None:
+    from app.db.database import engine
+
+    user_ids = [int(arg) for arg in sys.argv[1:]] or None
+    with engine.begin() as conn:
+        rebuild(conn, user_ids)
+        users, total = conn.execute(
+            text("SELECT count(DISTINCT user_id), coalesce(sum(recipe_count), 0) FROM user_recipe_stats")
+        ).one()
+    print(f"user_recipe_stats rebuilt: {users} users, {total} recipes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from sqlalchemy import text
@@ -10,9 +13,7 @@ from sqlalchemy.orm import Session
 from app.db.database import engine, get_db
 from app.db.base import Base
 from app.models import models  # noqa
-from app.routes.auth import router as auth_router
-from app.routes.recipes import router as recipes_router
-from app.routes.feed import router as feed_router
+from app.core import metrics
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.errors import (
@@ -20,11 +21,41 @@ from app.core.errors import (
     validation_exception_handler,
     unhandled_exception_handler,
 )
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.services import jobs, recipe_index
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiler import SQLProfilerMiddleware
+from app.middleware.rate_limit import (
+    MemoryStore,
+    RateLimitMiddleware,
+    SQLiteStore,
+    parse_route_costs,
+)
+
+if settings.DB_ASYNC:
+    from app.routes.auth_async import router as auth_router
+    from app.routes.recipes_async import router as recipes_router
+    from app.routes.feed_async import router as feed_router
+    from app.routes.users_async import router as users_router
+else:
+    from app.routes.auth import router as auth_router
+    from app.routes.recipes import router as recipes_router
+    from app.routes.feed import router as feed_router
+    from app.routes.users import router as users_router
 
 setup_logging()
 
-app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # build the in-memory recipe indexes in the background before they are asked for
+    recipe_index.start()
+    jobs.start()
+    yield
+    jobs.stop()
+
+
+app = FastAPI(title=settings.API_TITLE, version=settings.API_VERSION, lifespan=lifespan)
 
 # CORS (for later frontend)
 origins = [o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()]
@@ -38,7 +69,35 @@ app.add_middleware(
 
 # Rate limiting
 if settings.RATE_LIMIT_ENABLED:
-    app.add_middleware(RateLimitMiddleware, max_requests_per_minute=settings.RATE_LIMIT_PER_MINUTE)
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        rate_limit_store = SQLiteStore(settings.RATE_LIMIT_SQLITE_PATH)
+    else:
+        rate_limit_store = MemoryStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    app.add_middleware(
+        RateLimitMiddleware,
+        max_requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+        store=rate_limit_store,
+        route_costs=parse_route_costs(settings.RATE_LIMIT_ROUTE_COSTS),
+    )
+
+# SQL profiler (debug only)
+if settings.SQL_PROFILE_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Metrics (outside the rate limiter so 429s are counted too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Compression (added last so it is outermost and covers every response)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=[e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",") if e.strip()],
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
 
 # Error handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -50,6 +109,7 @@ app.add_exception_handler(Exception, unhandled_exception_handler)
 app.include_router(auth_router)
 app.include_router(recipes_router)
 app.include_router(feed_router)
+app.include_router(users_router)
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
@@ -57,6 +117,10 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 def health():
     return {"status": "ok", "env": settings.ENV}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/db-check")
 def db_check(db: Session = Depends(get_db)):
     return {"ok": bool(db.execute(text("SELECT 1")).scalar())}
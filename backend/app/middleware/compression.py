@@ -0,0 +1,209 @@
+"""Response compression negotiated from ``Accept-Encoding``, as raw ASGI middleware.
+
+Picks the client's highest-weighted coding among those available here
+(zstd and brotli need the optional ``zstandard`` / ``brotli`` packages,
+gzip is always there), with ties going to the server's preference order.
+Single-message bodies under ``minimum_size`` go out untouched, as do
+responses that are already encoded or whose content type is compressed
+already (images, archives, ...). Streamed bodies are compressed chunk by
+chunk and flushed after each, so NDJSON exports still arrive progressively.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Content types that are already compressed; prefixes match whole families.
+INCOMPRESSIBLE_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/gzip",
+    "application/zip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/octet-stream",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.process(data) + self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+def available_encodings() -> list[str]:
+    return [e for e, ok in (("zstd", zstandard), ("br", brotli), ("gzip", True)) if ok]
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """``"gzip;q=0.8, br"`` -> {"gzip": 0.8, "br": 1.0}."""
+    weights = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, val = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def choose_encoding(accept_encoding: str, preferred: list[str]) -> str | None:
+    weights = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in preferred:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        encodings: list[str] | None = None,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        available = available_encodings()
+        self.encodings = [e for e in (encodings or available) if e in available]
+        self.levels = {"gzip": gzip_level, "br": brotli_quality, "zstd": zstd_level}
+
+    def _compressor(self, encoding: str):
+        level = self.levels[encoding]
+        if encoding == "zstd":
+            return _Zstd(level)
+        if encoding == "br":
+            return _Brotli(level)
+        return _Gzip(level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or content_type.startswith(INCOMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                length = headers.get("content-length")
+                small = len(body) < self.minimum_size if not more_body else (
+                    length is not None and int(length) < self.minimum_size
+                )
+                if small:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = self._compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # the encoded bytes differ, so the tag can only be weak
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["content-length"]
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+                else:
+                    compressed = compressor.finish(body)
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if more_body:
+                chunk = compressor.compress(body)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,45 @@
+"""Per-route request metrics as raw ASGI middleware (see app/core/metrics.py)."""
+import time
+
+from app.core import metrics
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        db_stats = [0, 0.0]
+        token = metrics.request_db_stats.set(db_stats)
+        # Only the method: the route template is not known until routing ran
+        metrics.HTTP_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.request_db_stats.reset(token)
+            metrics.HTTP_IN_FLIGHT.dec(method)
+
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                # mounted apps (StaticFiles) set root_path instead of route
+                route = f"{scope['root_path']}/{{path}}" if scope.get("root_path") else "unmatched"
+            metrics.HTTP_REQUESTS.inc(method, route, str(status))
+            metrics.HTTP_LATENCY.observe(elapsed, method, route)
+            if db_stats[0]:
+                metrics.DB_QUERIES.inc(route, amount=db_stats[0])
+                metrics.DB_QUERY_SECONDS.inc(route, amount=db_stats[1])
@@ -0,0 +1,39 @@
+"""Wraps each request in a SQL profile (app/db/profiler.py) and reports it.
+
+Adds ``X-Request-ID`` (the client's, if it sent a well-formed one) plus ``X-DB-Queries``
+and a ``Server-Timing: db`` entry covering the statements run before the
+response started.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.db import profiler
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = profiler.request_id(Headers(scope=scope).get("x-request-id"))
+        profile = profiler.RequestProfile(request_id, scope["method"], scope["path"])
+        token = profiler.current_profile.set(profile)
+
+        async def send_with_summary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-DB-Queries"] = str(profile.queries)
+                headers.append(
+                    "Server-Timing", f'db;dur={profile.seconds * 1000:.2f};desc="{profile.queries} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_summary)
+        finally:
+            profiler.current_profile.reset(token)
+            profiler.report(profile)
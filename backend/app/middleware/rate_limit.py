@@ -1,29 +1,193 @@
+"""Token-bucket rate limiting as raw ASGI middleware.
+
+Every client key owns a bucket holding up to ``max_requests_per_minute``
+tokens that refills continuously; a request spends its route's cost. State
+is two floats per key, and a bucket idle long enough to be full again is
+indistinguishable from a missing one, so idle keys are evicted.
+
+Authenticated requests are keyed by the token's user id, anonymous ones by
+client IP. ``MemoryStore`` is per process; ``SQLiteStore`` shares buckets
+between all workers on a host. Stores marked ``blocking`` are called on a
+worker thread of their own, never on the event loop.
+"""
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict, deque
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+from anyio import CapacityLimiter, to_thread
+from jose import JWTError, jwt
 from starlette.responses import JSONResponse
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests_per_minute: int = 60):
-        super().__init__(app)
-        self.max = max_requests_per_minute
-        self.window = 60
-        self.hits = defaultdict(deque)  # key -> timestamps
+from app.core import metrics
+from app.core.security import JWT_ALG, JWT_SECRET
+
+
+class MemoryStore:
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at), least recently used first
+        self._buckets: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: str, cost: float, capacity: float, rate: float, now: float) -> tuple[bool, float]:
+        """Spend ``cost`` tokens; returns (allowed, seconds until it would be)."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + max(0.0, now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._evict(now, capacity / rate)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def _evict(self, now: float, idle_seconds: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, (_, updated) = next(iter(buckets.items()))
+            if now - updated < idle_seconds and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
+
+
+class SQLiteStore:
+    """Buckets in a local SQLite file so every worker process shares them.
+
+    One UPSERT ... RETURNING per request; SQLite serializes writers, which
+    makes the read-refill-spend step atomic across processes. That can mean
+    waiting on another process's write lock, hence ``blocking``.
+    """
+
+    blocking = True
+
+    _HIT = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated, allowed)
+        VALUES (:key, :capacity - :cost, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            allowed = min(:capacity, tokens + max(:now - updated, 0) * :rate) >= :cost,
+            tokens = min(:capacity, tokens + max(:now - updated, 0) * :rate)
+                - CASE WHEN min(:capacity, tokens + max(:now - updated, 0) * :rate) >= :cost
+                       THEN :cost ELSE 0 END,
+            updated = :now
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, path: str, sweep_interval: float = 60.0):
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM rate_limit_buckets").fetchone()[0]
+
+    def hit(self, key: str, cost: float, capacity: float, rate: float, now: float) -> tuple[bool, float]:
+        params = {"key": key, "cost": cost, "capacity": capacity, "rate": rate, "now": now}
+        with self._lock:
+            tokens, allowed = self._conn.execute(self._HIT, params).fetchone()
+            if now >= self._next_sweep:
+                self._next_sweep = now + self.sweep_interval
+                self._conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated < ?", (now - capacity / rate,)
+                )
+        return bool(allowed), 0.0 if allowed else (cost - tokens) / rate
+
+
+def parse_route_costs(spec: str) -> list[tuple[str, str, float]]:
+    """``"POST /auth/login=5, * /recipes/*/photo=5"`` -> [(method, path glob, cost)]."""
+    rules = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        route, cost = item.rsplit("=", 1)
+        method, pattern = route.split(None, 1)
+        rules.append((method.upper(), pattern.strip(), float(cost)))
+    return rules
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        max_requests_per_minute: int = 60,
+        store=None,
+        route_costs: list[tuple[str, str, float]] = (),
+    ):
+        self.app = app
+        self.capacity = float(max_requests_per_minute)
+        self.rate = max_requests_per_minute / 60.0  # tokens per second
+        self.store = store if store is not None else MemoryStore()
+        # hit() is serialized by the store's own lock, so one thread is enough;
+        # a separate limiter keeps it off the threadpool the routes use
+        self._store_limiter = CapacityLimiter(1)
+        self.route_costs = list(route_costs)
+        self.rejections = 0
+
+    def _cost(self, method: str, path: str) -> float:
+        for rule_method, pattern, cost in self.route_costs:
+            if rule_method in ("*", method) and fnmatchcase(path, pattern):
+                return min(cost, self.capacity)
+        return 1.0
+
+    def _key(self, scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        sub = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG]).get("sub")
+                    except JWTError:
+                        sub = None
+                    if sub is not None:
+                        return f"user:{sub}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
 
-    async def dispatch(self, request: Request, call_next):
-        ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        q = self.hits[ip]
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        while q and (now - q[0]) > self.window:
-            q.popleft()
+        cost = self._cost(scope["method"], scope["path"])
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
 
-        if len(q) >= self.max:
-            return JSONResponse(
+        args = (self._key(scope), cost, self.capacity, self.rate, time.time())
+        if self.store.blocking:
+            allowed, retry_after = await to_thread.run_sync(self.store.hit, *args, limiter=self._store_limiter)
+        else:
+            allowed, retry_after = self.store.hit(*args)
+        if not allowed:
+            self.rejections += 1
+            metrics.RATE_LIMIT_REJECTIONS.inc()
+            response = JSONResponse(
                 status_code=429,
                 content={"error": {"message": "Too many requests", "type": "rate_limited"}},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
             )
+            await response(scope, receive, send)
+            return
 
-        q.append(now)
-        return await call_next(request)
+        await self.app(scope, receive, send)
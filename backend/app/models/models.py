@@ -1,12 +1,18 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import (
-    String, Integer, ForeignKey, Text, DateTime, Boolean
+    String, Integer, BigInteger, ForeignKey, Text, DateTime, Boolean, Index, JSON, text
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 from sqlalchemy.sql import func
 
 from app.db.base import Base
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -24,6 +30,28 @@ class User(Base):
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Keyset pagination: owner listings and the public feed seek on id.
+        Index("ix_recipes_created_by_id", "created_by", "id"),
+        # updated_at rides along so the feed's count/max(updated_at)
+        # validator probe is answered from the index alone.
+        Index(
+            "ix_recipes_public_id",
+            "id",
+            "updated_at",
+            postgresql_where=text("is_public IS TRUE"),
+            sqlite_where=text("is_public IS 1"),
+        ),
+        Index(
+            "ix_recipes_public_cuisine_id",
+            "cuisine",
+            "id",
+            postgresql_where=text("is_public IS TRUE"),
+            sqlite_where=text("is_public IS 1"),
+        ),
+        # Catch-up reads of the in-memory recipe indexes (app/services/recipe_index.py)
+        Index("ix_recipes_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     created_by: Mapped[int] = mapped_column(
@@ -46,6 +74,16 @@ class Recipe(Base):
     rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     review: Mapped[str | None] = mapped_column(Text, nullable=True)
     photo_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Set once photo_url's WebP/JPEG variants exist, see app/services/images.py
+    photo_derived: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=text("false"), nullable=False
+    )
+    # Only populated by list queries, see app/services/projection.py.
+    review_excerpt: Mapped[str | None] = query_expression()
+    # Full-text search (search_vector on Postgres, recipes_fts on SQLite) is
+    # maintained by the database itself, see app/db/search.py. Facet counts
+    # live in recipe_facets, see app/db/facets.py, and per-user stats in
+    # user_recipe_stats, see app/db/user_stats.py.
 
 
 
@@ -53,5 +91,83 @@ class Recipe(Base):
         DateTime(timezone=True),
         server_default=func.now()
     )
+    # Set in Python for microsecond precision on every backend; it drives
+    # the ETag/Last-Modified validators (app/core/conditional.py).
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+        nullable=False,
+    )
 
     creator = relationship("User", back_populates="recipes")
+
+
+class RecipeFacet(Base):
+    """Public recipe count per facet cell; maintained by triggers, see app/db/facets.py."""
+    __tablename__ = "recipe_facets"
+
+    # NULL cuisine/difficulty are stored as '', NULL rating and buckets as -1
+    cuisine: Mapped[str] = mapped_column(String(80), primary_key=True)
+    difficulty: Mapped[str] = mapped_column(String(20), primary_key=True)
+    rating: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    cook_bucket: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    calorie_bucket: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    protein_bucket: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    recipe_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class UserRecipeStat(Base):
+    """One user's recipe counts and macro sums per cell; maintained by triggers, see app/db/user_stats.py."""
+    __tablename__ = "user_recipe_stats"
+
+    # NULL cuisine/difficulty are stored as '', NULL rating as -1
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    cuisine: Mapped[str] = mapped_column(String(80), primary_key=True)
+    difficulty: Mapped[str] = mapped_column(String(20), primary_key=True)
+    rating: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    recipe_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    public_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # sum over the recipes that have the macro, and how many do
+    calories_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    calories_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    protein_g_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    protein_g_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    carbs_g_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    carbs_g_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fat_g_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    fat_g_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    """A unit of background work; queued and run by app/services/jobs.py."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming: the oldest due queued job, or an expired running one
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        # An idempotency key names at most one queued job
+        Index(
+            "uq_jobs_queued_key",
+            "idempotency_key",
+            unique=True,
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    idempotency_key: Mapped[str | None] = mapped_column(String(255))
+    # queued -> running -> done | failed (or back to queued for a retry)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    # Set in Python, like Recipe.updated_at, so they compare on every backend
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    run_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    locked_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    locked_by: Mapped[str | None] = mapped_column(String(100))
+    finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
@@ -1,42 +1,81 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
 from app.models.models import User
 from app.schemas.user import UserCreate, UserLogin, Token
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    create_access_token,
+    hash_password,
+    run_hash_job_async,
+    verify_and_update_password,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# The handlers are async so that waiting on Argon2 doesn't hold a threadpool
+# thread; only their (sync) database work runs on the threadpool. Lookups
+# end their transaction before the hash so a queue of sign-ins doesn't hold
+# pooled connections; the write after it is a transaction of its own.
 
-@router.post("/register", response_model=Token)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    existing = (
-        db.query(User)
-        .filter((User.email == payload.email) | (User.username == payload.username))
+
+def _exists(db: Session, email: str, username: str) -> bool:
+    found = (
+        db.query(User.id)
+        .filter((User.email == email) | (User.username == username))
         .first()
     )
-    if existing:
+    db.rollback()
+    return found is not None
+
+
+def _add(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
+def _by_email(db: Session, email: str):
+    row = db.query(User.id, User.password_hash).filter(User.email == email).first()
+    db.rollback()
+    return row
+
+
+def _rehash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
+@router.post("/register", response_model=Token)
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_exists, db, payload.email, payload.username):
         raise HTTPException(status_code=400, detail="Email or username already exists")
 
     user = User(
         username=payload.username,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await run_hash_job_async(hash_password, payload.password),
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_add, db, user)
 
     token = create_access_token(str(user.id))
     return Token(access_token=token)
 
 
 @router.post("/login", response_model=Token)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: UserLogin, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_by_email, db, payload.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    ok, new_hash = await run_hash_job_async(verify_and_update_password, payload.password, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash predates the current Argon2 parameters
+        await run_in_threadpool(_rehash, db, user.id, new_hash)
 
     token = create_access_token(str(user.id))
     return Token(access_token=token)
@@ -0,0 +1,68 @@
+"""Async variants of the auth routes, mounted instead of ``app.routes.auth``
+when ``DB_ASYNC`` is enabled."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_async_db
+from app.models.models import User
+from app.schemas.user import UserCreate, UserLogin, Token
+from app.core.security import (
+    create_access_token,
+    hash_password,
+    run_hash_job_async,
+    verify_and_update_password,
+)
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+# Lookups end their transaction before the hash so a queue of sign-ins
+# doesn't hold pooled connections; the write after it is a transaction of
+# its own.
+
+
+@router.post("/register", response_model=Token)
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = (
+        await db.execute(
+            select(User.id)
+            .where((User.email == payload.email) | (User.username == payload.username))
+            .limit(1)
+        )
+    ).first()
+    await db.rollback()
+    if existing:
+        raise HTTPException(status_code=400, detail="Email or username already exists")
+
+    password_hash = await run_hash_job_async(hash_password, payload.password)
+    user = User(
+        username=payload.username,
+        email=payload.email,
+        password_hash=password_hash,
+    )
+    db.add(user)
+    await db.commit()
+
+    token = create_access_token(str(user.id))
+    return Token(access_token=token)
+
+
+@router.post("/login", response_model=Token)
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (
+        await db.execute(select(User.id, User.password_hash).where(User.email == payload.email))
+    ).first()
+    await db.rollback()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    ok, new_hash = await run_hash_job_async(verify_and_update_password, payload.password, user.password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash predates the current Argon2 parameters
+        await db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+        await db.commit()
+
+    token = create_access_token(str(user.id))
+    return Token(access_token=token)
@@ -1,17 +1,115 @@
-from fastapi import APIRouter, Depends
+import pydantic_core
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.core.conditional import is_not_modified, not_modified, page_validators
+from app.core.pagination import paginate, probe_statement
+from app.core.deps import bearer_user_id
+from app.db.database import read_session, read_session_async
+from app.db.replicas import is_sticky
+from app.db.search import apply_search
 from app.models.models import Recipe
-from app.schemas.recipe import RecipeOut
-from app.schemas.common import Page, PageMeta
+from app.core.responses import JSONBytesResponse
+from app.schemas.common import Page
+from app.schemas.recipe import FeedFacets, MacroMatchPage, RecipeFields, RecipeSummary, SimilarPage
+from app.services import feed_cache, macro_match, similar
+from app.services.facets import facets_statement, summarize
+from app.services.projection import dump_items, load_options, parse_fields, render_page
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
 
-@router.get("", response_model=dict)
+def filter_params(q, cuisine, max_cook_time, min_rating, max_calories, min_protein):
+    return {
+        "q": (q or "").strip() or None,
+        "cuisine": cuisine or None,
+        "max_cook_time": max_cook_time,
+        "min_rating": min_rating,
+        "max_calories": max_calories,
+        "min_protein": min_protein,
+    }
+
+
+def feed_params(q, cuisine, max_cook_time, min_rating, max_calories, min_protein, limit, offset, cursor, fields):
+    """Normalize the feed query string; the result doubles as the cache key."""
+    return {
+        **filter_params(q, cuisine, max_cook_time, min_rating, max_calories, min_protein),
+        "limit": max(1, min(limit, 50)),
+        "offset": 0 if cursor else max(0, offset),
+        "cursor": cursor,
+        "fields": parse_fields(fields),
+    }
+
+
+def feed_on_primary(request: Request) -> bool:
+    # Right after a public write a lagging replica would refill the cache
+    # with the old page, so misses go to the primary for the sticky window.
+    return feed_cache.invalidated_within(settings.REPLICA_STICKY_SECONDS) or is_sticky(
+        bearer_user_id(request)
+    )
+
+
+def get_feed_db(request: Request):
+    yield from read_session(primary=feed_on_primary(request))
+
+
+async def get_feed_db_async(request: Request):
+    async for db in read_session_async(primary=feed_on_primary(request)):
+        yield db
+
+
+def feed_cache_key(params: dict) -> tuple:
+    return (feed_cache.current_version(), *params.values())
+
+
+def feed_statement(params: dict, dialect: str):
+    """Filtered public-recipe SELECT plus the search rank (or None)."""
+    filters = [Recipe.is_public.is_(True)]
+
+    if params["cuisine"]:
+        filters.append(Recipe.cuisine == params["cuisine"])
+    if params["max_cook_time"] is not None:
+        filters.append(Recipe.cook_time <= params["max_cook_time"])
+    if params["min_rating"] is not None:
+        filters.append(Recipe.rating >= params["min_rating"])
+    if params["max_calories"] is not None:
+        filters.append(Recipe.calories <= params["max_calories"])
+    if params["min_protein"] is not None:
+        filters.append(Recipe.protein_g >= params["min_protein"])
+
+    stmt = select(Recipe).where(and_(*filters))
+    rank = None
+    if params["q"]:
+        stmt, rank = apply_search(stmt, params["q"], dialect)
+    return stmt, rank
+
+
+def feed_validators(params: dict, total: int, last_modified) -> dict:
+    return page_validators(tuple(params.values()), total, last_modified, "no-cache")
+
+
+def cached_feed_response(request: Request, cached):
+    body, headers = cached
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+    return JSONBytesResponse(body, headers=headers)
+
+
+def feed_page(params: dict, total: int, items, next_cursor) -> bytes:
+    meta = {
+        "limit": params["limit"],
+        "offset": params["offset"],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+    return render_page(meta, items, params["fields"])
+
+
+@router.get("", response_model=Page[RecipeSummary | RecipeFields], response_class=JSONBytesResponse)
 def public_feed(
+    request: Request,
     q: str | None = None,
     cuisine: str | None = None,
     max_cook_time: int | None = None,
@@ -20,37 +118,162 @@ def public_feed(
     min_protein: int | None = None,
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_feed_db),
 ):
-    limit = max(1, min(limit, 50))
-    offset = max(0, offset)
+    params = feed_params(
+        q, cuisine, max_cook_time, min_rating, max_calories, min_protein, limit, offset, cursor, fields
+    )
 
-    filters = [Recipe.is_public.is_(True)]
+    cache_key = feed_cache_key(params)
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return cached_feed_response(request, cached)
 
-    if q:
-        filters.append(Recipe.title.ilike(f"%{q}%"))
-    if cuisine:
-        filters.append(Recipe.cuisine == cuisine)
-    if max_cook_time is not None:
-        filters.append(Recipe.cook_time <= max_cook_time)
-    if min_rating is not None:
-        filters.append(Recipe.rating >= min_rating)
-    if max_calories is not None:
-        filters.append(Recipe.calories <= max_calories)
-    if min_protein is not None:
-        filters.append(Recipe.protein_g >= min_protein)
-
-    base = db.query(Recipe).filter(and_(*filters))
-    total = base.count()
-
-    items = (
-        base.order_by(Recipe.id.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    stmt, rank = feed_statement(params, db.get_bind().dialect.name)
+    total, last_modified = db.execute(probe_statement(stmt)).one()
+    headers = feed_validators(params, total, last_modified)
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+
+    items, _, next_cursor = paginate(
+        db, stmt.options(*load_options(params["fields"])), Recipe.id,
+        params["limit"], params["offset"], cursor, rank=rank,
     )
 
+    body = feed_page(params, total, items, next_cursor)
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, (body, headers))
+    return JSONBytesResponse(body, headers=headers)
+
+
+@router.get("/facets", response_model=FeedFacets)
+def feed_facets(
+    q: str | None = None,
+    cuisine: str | None = None,
+    max_cook_time: int | None = None,
+    min_rating: int | None = None,
+    max_calories: int | None = None,
+    min_protein: int | None = None,
+    db: Session = Depends(get_feed_db),
+):
+    params = filter_params(q, cuisine, max_cook_time, min_rating, max_calories, min_protein)
+
+    cache_key = ("facets", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    stmt, predicate = facets_statement(params, feed_statement(params, db.get_bind().dialect.name)[0])
+    facets = summarize(db.execute(stmt).all(), predicate)
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, facets)
+    return facets
+
+
+def macro_params(calories, protein_g, carbs_g, fat_g, cuisine, max_cook_time, limit, fields) -> dict:
+    if not settings.MACRO_MATCH_ENABLED:
+        raise HTTPException(status_code=404, detail="Macro match is disabled")
+    targets = {"calories": calories, "protein_g": protein_g, "carbs_g": carbs_g, "fat_g": fat_g}
+    if all(value is None for value in targets.values()):
+        raise HTTPException(status_code=400, detail="Give at least one of calories, protein_g, carbs_g, fat_g")
     return {
-        "meta": {"limit": limit, "offset": offset, "total": total},
-        "items": [RecipeOut.model_validate(x) for x in items],
+        **targets,
+        "cuisine": cuisine or None,
+        "max_cook_time": max_cook_time,
+        "limit": max(1, min(limit, 50)),
+        "fields": parse_fields(fields),
     }
+
+
+def macro_meta(params: dict) -> dict:
+    return {name: value for name, value in params.items() if name != "fields"}
+
+
+@router.get("/macro-match", response_model=MacroMatchPage, response_class=JSONBytesResponse)
+def match_macros(
+    calories: float | None = None,
+    protein_g: float | None = None,
+    carbs_g: float | None = None,
+    fat_g: float | None = None,
+    cuisine: str | None = None,
+    max_cook_time: int | None = None,
+    limit: int = 10,
+    fields: str | None = None,
+    db: Session = Depends(get_feed_db),
+):
+    params = macro_params(calories, protein_g, carbs_g, fat_g, cuisine, max_cook_time, limit, fields)
+
+    cache_key = ("macro", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return JSONBytesResponse(cached)
+
+    hits = macro_match.index.nearest(
+        params, params["cuisine"], params["max_cook_time"], params["limit"] + macro_match.SLACK
+    )
+    items = db.execute(hits_statement(hits, params["fields"])).scalars().all()
+
+    body = ranked_page(macro_meta(params), hits, items, params["fields"], "distance")
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, body)
+    return JSONBytesResponse(body)
+
+
+def similar_params(recipe_id: int, limit: int, fields: str | None) -> dict:
+    if not settings.SIMILAR_ENABLED:
+        raise HTTPException(status_code=404, detail="Similar recipes are disabled")
+    return {"recipe_id": recipe_id, "limit": max(1, min(limit, 50)), "fields": parse_fields(fields)}
+
+
+def hits_statement(hits, fields):
+    # hits can lag the database (writes on other workers), so re-check them
+    ids = [recipe_id for recipe_id, _ in hits]
+    return select(Recipe).where(Recipe.id.in_(ids), Recipe.is_public.is_(True)).options(*load_options(fields))
+
+
+def ranked_page(meta: dict, hits, items, fields, score_name: str) -> bytes:
+    """Items in ``hits`` order (first ``meta["limit"]``), each with its score."""
+    by_id = {recipe.id: recipe for recipe in items}
+    ranked = [(by_id[recipe_id], score) for recipe_id, score in hits if recipe_id in by_id][:meta["limit"]]
+    rows = dump_items([recipe for recipe, _ in ranked], fields)
+    for row, (_, score) in zip(rows, ranked):
+        row[score_name] = round(score, 4)
+    return pydantic_core.to_json({"meta": meta, "items": rows})
+
+
+@router.get("/{recipe_id}/similar", response_model=SimilarPage, response_class=JSONBytesResponse)
+def similar_recipes(
+    recipe_id: int,
+    limit: int = 10,
+    fields: str | None = None,
+    db: Session = Depends(get_feed_db),
+):
+    params = similar_params(recipe_id, limit, fields)
+
+    cache_key = ("similar", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return JSONBytesResponse(cached)
+
+    source = db.execute(similar.source_statement(recipe_id)).first()
+    if source is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    hits = similar.index.similar_to(source, params["limit"] + similar.SLACK)
+    items = db.execute(hits_statement(hits, params["fields"])).scalars().all()
+
+    meta = {"recipe_id": recipe_id, "limit": params["limit"]}
+    body = ranked_page(meta, hits, items, params["fields"], "score")
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, body)
+    return JSONBytesResponse(body)
+
+
+@router.get("/cache-stats")
+def feed_cache_stats():
+    return feed_cache.stats()
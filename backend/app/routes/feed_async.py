@@ -0,0 +1,169 @@
+"""Async variant of the public feed, mounted instead of ``app.routes.feed``
+when ``DB_ASYNC`` is enabled."""
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.conditional import is_not_modified, not_modified
+from app.core.pagination import finish_page, page_statement, probe_statement
+from app.core.responses import JSONBytesResponse
+from app.models.models import Recipe
+from app.routes.feed import (
+    cached_feed_response,
+    feed_cache_key,
+    get_feed_db_async,
+    feed_page,
+    feed_params,
+    feed_statement,
+    feed_validators,
+    filter_params,
+    hits_statement,
+    macro_meta,
+    macro_params,
+    ranked_page,
+    similar_params,
+)
+from app.schemas.common import Page
+from app.schemas.recipe import FeedFacets, MacroMatchPage, RecipeFields, RecipeSummary, SimilarPage
+from app.services import feed_cache, macro_match, similar
+from app.services.facets import facets_statement, summarize
+from app.services.projection import load_options
+
+router = APIRouter(prefix="/feed", tags=["feed"])
+
+
+@router.get("", response_model=Page[RecipeSummary | RecipeFields], response_class=JSONBytesResponse)
+async def public_feed(
+    request: Request,
+    q: str | None = None,
+    cuisine: str | None = None,
+    max_cook_time: int | None = None,
+    min_rating: int | None = None,
+    max_calories: int | None = None,
+    min_protein: int | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: str | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_feed_db_async),
+):
+    params = feed_params(
+        q, cuisine, max_cook_time, min_rating, max_calories, min_protein, limit, offset, cursor, fields
+    )
+
+    cache_key = feed_cache_key(params)
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return cached_feed_response(request, cached)
+
+    stmt, rank = feed_statement(params, db.bind.dialect.name)
+    total, last_modified = (await db.execute(probe_statement(stmt))).one()
+    headers = feed_validators(params, total, last_modified)
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+
+    stmt = stmt.options(*load_options(params["fields"]))
+    rows = (
+        await db.execute(
+            page_statement(stmt, Recipe.id, params["limit"], params["offset"], cursor, rank=rank)
+        )
+    ).all()
+    items, next_cursor = finish_page(rows, Recipe.id, params["limit"], rank=rank)
+
+    body = feed_page(params, total, items, next_cursor)
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, (body, headers))
+    return JSONBytesResponse(body, headers=headers)
+
+
+@router.get("/facets", response_model=FeedFacets)
+async def feed_facets(
+    q: str | None = None,
+    cuisine: str | None = None,
+    max_cook_time: int | None = None,
+    min_rating: int | None = None,
+    max_calories: int | None = None,
+    min_protein: int | None = None,
+    db: AsyncSession = Depends(get_feed_db_async),
+):
+    params = filter_params(q, cuisine, max_cook_time, min_rating, max_calories, min_protein)
+
+    cache_key = ("facets", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    stmt, predicate = facets_statement(params, feed_statement(params, db.bind.dialect.name)[0])
+    facets = summarize((await db.execute(stmt)).all(), predicate)
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, facets)
+    return facets
+
+
+@router.get("/macro-match", response_model=MacroMatchPage, response_class=JSONBytesResponse)
+async def match_macros(
+    calories: float | None = None,
+    protein_g: float | None = None,
+    carbs_g: float | None = None,
+    fat_g: float | None = None,
+    cuisine: str | None = None,
+    max_cook_time: int | None = None,
+    limit: int = 10,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_feed_db_async),
+):
+    params = macro_params(calories, protein_g, carbs_g, fat_g, cuisine, max_cook_time, limit, fields)
+
+    cache_key = ("macro", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return JSONBytesResponse(cached)
+
+    hits = await run_in_threadpool(
+        macro_match.index.nearest,
+        params, params["cuisine"], params["max_cook_time"], params["limit"] + macro_match.SLACK,
+    )
+    items = (await db.execute(hits_statement(hits, params["fields"]))).scalars().all()
+
+    body = ranked_page(macro_meta(params), hits, items, params["fields"], "distance")
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, body)
+    return JSONBytesResponse(body)
+
+
+@router.get("/{recipe_id}/similar", response_model=SimilarPage, response_class=JSONBytesResponse)
+async def similar_recipes(
+    recipe_id: int,
+    limit: int = 10,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_feed_db_async),
+):
+    params = similar_params(recipe_id, limit, fields)
+
+    cache_key = ("similar", *feed_cache_key(params))
+    if settings.FEED_CACHE_ENABLED:
+        cached = feed_cache.cache.get(cache_key)
+        if cached is not None:
+            return JSONBytesResponse(cached)
+
+    source = (await db.execute(similar.source_statement(recipe_id))).first()
+    if source is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    # the matrix product runs in BLAS without the GIL; keep it off the loop
+    hits = await run_in_threadpool(similar.index.similar_to, source, params["limit"] + similar.SLACK)
+    items = (await db.execute(hits_statement(hits, params["fields"]))).scalars().all()
+
+    meta = {"recipe_id": recipe_id, "limit": params["limit"]}
+    body = ranked_page(meta, hits, items, params["fields"], "score")
+    if settings.FEED_CACHE_ENABLED:
+        feed_cache.cache.set(cache_key, body)
+    return JSONBytesResponse(body)
+
+
+@router.get("/cache-stats")
+async def feed_cache_stats():
+    return feed_cache.stats()
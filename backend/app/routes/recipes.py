@@ -1,14 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db.database import get_db
-from app.models.models import Recipe, User
-from app.schemas.recipe import RecipeCreate, RecipeOut, RecipeUpdate
-from app.core.deps import get_current_user
+from app.core.conditional import (
+    is_not_modified,
+    not_modified,
+    page_validators,
+    recipe_validators,
+)
+from app.core.pagination import paginate, probe_statement
+from app.db.database import SessionLocal, get_db
+from app.models.models import Recipe
+from app.core.responses import JSONBytesResponse
+from app.schemas.common import Page
+from app.schemas.recipe import (
+    BatchResult,
+    RecipeBatch,
+    RecipeBatchDelete,
+    RecipeBatchUpdate,
+    RecipeCreate,
+    RecipeFields,
+    RecipeOut,
+    RecipeSummary,
+    RecipeUpdate,
+)
+from app.core.deps import get_current_user_id, get_read_db
+from app.core.config import settings
+from app.services import feed_cache, jobs, recipe_index, recipe_writes
+from app.services.batch import (
+    batch_changes,
+    batch_results,
+    check_ids,
+    delete_statement,
+    parse_ids,
+    render_batch,
+    update_statement,
+)
+from app.services.bulk import export_line, export_statement, import_body, read_body
+from app.services.projection import load_options, parse_fields, render_page
+from app.services.storage import discard_upload, store_upload
 
 from fastapi import UploadFile, File
-import os
-import uuid
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
@@ -17,67 +51,131 @@ router = APIRouter(prefix="/recipes", tags=["recipes"])
 def create_recipe(
     payload: RecipeCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    recipe = Recipe(
-        created_by=current_user.id,
-        title=payload.title,
-        author=payload.author,
-        description=payload.description,
-        instructions=payload.instructions,
-        cook_time=payload.cook_time,
-        cuisine=payload.cuisine,
-        difficulty=payload.difficulty,
-        is_public=payload.is_public,
-        calories=payload.calories,
-        protein_g=payload.protein_g,
-        carbs_g=payload.carbs_g,
-        fat_g=payload.fat_g,
-        rating=payload.rating,
-        review=payload.review,
-    )
-    db.add(recipe)
+    row = db.execute(recipe_writes.insert_statement(user_id, payload.model_dump())).one()
     db.commit()
-    db.refresh(recipe)
-    return recipe
+    feed_cache.invalidate_if_public(row.is_public)
+    recipe_index.record(row)
+    return row
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=Page[RecipeSummary | RecipeFields] | RecipeBatch, response_class=JSONBytesResponse)
 def list_my_recipes(
+    request: Request,
     limit: int = 20,
     offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    cursor: str | None = None,
+    fields: str | None = None,
+    ids: str | None = None,
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
 ):
     limit = max(1, min(limit, 50))
+    fields = parse_fields(fields)
     offset = max(0, offset)
 
-    base = db.query(Recipe).filter(Recipe.created_by == current_user.id)
+    base = select(Recipe).where(Recipe.created_by == user_id)
+    if ids is not None:
+        ids = parse_ids(ids, settings.RECIPE_BATCH_MAX_IDS)
+        base = base.where(Recipe.id.in_(ids))
+
+    total, last_modified = db.execute(probe_statement(base)).one()
+    key = (user_id, ids, fields) if ids is not None else (user_id, limit, offset, cursor, fields)
+    headers = page_validators(key, total, last_modified, "private, no-cache")
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+
+    if ids is not None:
+        items = db.execute(base.options(*load_options(fields))).scalars().all()
+        return JSONBytesResponse(render_batch(ids, items, fields), headers=headers)
+
+    items, offset, next_cursor = paginate(
+        db, base.options(*load_options(fields)), Recipe.id, limit, offset, cursor
+    )
+
+    meta = {"limit": limit, "offset": offset, "total": total, "next_cursor": next_cursor}
+    return JSONBytesResponse(render_page(meta, items, fields), headers=headers)
+
+
+@router.post("/bulk")
+async def bulk_import_recipes(
+    request: Request,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    body = await read_body(request, settings.BULK_MAX_BYTES)
+    return await run_in_threadpool(
+        import_body, db, body, request.headers.get("content-type", ""), user_id, settings.BULK_MAX_ROWS
+    )
+
 
-    total = base.count()
+@router.get("/export")
+def export_recipes(user_id: int = Depends(get_current_user_id)):
+    # The stream outlives the request's get_db session, so it opens its own.
+    def lines():
+        with SessionLocal() as db:
+            result = db.execute(export_statement(select(Recipe).where(Recipe.created_by == user_id)))
+            for chunk in result.scalars().partitions():
+                yield "".join(export_line(r) for r in chunk)
 
-    items = (
-        base.order_by(Recipe.id.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="recipes.ndjson"'},
     )
 
-    return {
-        "meta": {"limit": limit, "offset": offset, "total": total},
-        "items": [RecipeOut.model_validate(r) for r in items],
-    }
+
+# Declared before the /{recipe_id} routes, which would take "batch" as an id.
+@router.patch("/batch", response_model=BatchResult)
+def update_recipes_batch(
+    payload: RecipeBatchUpdate,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    ids = check_ids(payload.ids, settings.RECIPE_BATCH_MAX_IDS)
+    changes = batch_changes(payload.changes)
+
+    rows = db.execute(update_statement(user_id, ids, changes)).all()
+    db.commit()
+    if rows:
+        feed_cache.invalidate_if_public("is_public" in changes, *(row.is_public for row in rows))
+        recipe_index.poke()
+    return batch_results(ids, {row.id for row in rows}, "updated")
+
+
+@router.delete("/batch", response_model=BatchResult)
+def delete_recipes_batch(
+    payload: RecipeBatchDelete,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    ids = check_ids(payload.ids, settings.RECIPE_BATCH_MAX_IDS)
+
+    rows = db.execute(delete_statement(user_id, ids)).all()
+    db.commit()
+    feed_cache.invalidate_if_public(*(row.is_public for row in rows))
+    for row in rows:
+        recipe_index.discard(row.id)
+    return batch_results(ids, {row.id for row in rows}, "deleted")
 
 
 @router.get("/{recipe_id}", response_model=RecipeOut)
 def get_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
 ):
     recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe or recipe.created_by != current_user.id:
+    if not recipe or recipe.created_by != user_id:
         raise HTTPException(status_code=404, detail="Recipe not found")
+
+    headers = recipe_validators(recipe)
+    if is_not_modified(request.headers, headers["ETag"], recipe.updated_at):
+        return not_modified(headers)
+    response.headers.update(headers)
     return recipe
 
 
@@ -86,33 +184,27 @@ def update_recipe(
     recipe_id: int,
     payload: RecipeUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe or recipe.created_by != current_user.id:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-
     data = payload.model_dump(exclude_unset=True)
-    for k, v in data.items():
-        setattr(recipe, k, v)
-
+    row = recipe_writes.found(db.execute(recipe_writes.update_statement(user_id, recipe_id, data)).first())
     db.commit()
-    db.refresh(recipe)
-    return recipe
+    # RETURNING has the new values only; the old visibility differs only if it was set
+    feed_cache.invalidate_if_public("is_public" in data, row.is_public)
+    recipe_index.record(row)
+    return row
 
 
 @router.delete("/{recipe_id}")
 def delete_recipe(
     recipe_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe or recipe.created_by != current_user.id:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-
-    db.delete(recipe)
+    row = recipe_writes.found(db.execute(recipe_writes.delete_statement(user_id, recipe_id)).first())
     db.commit()
+    feed_cache.invalidate_if_public(row.is_public)
+    recipe_index.discard(recipe_id)
     return {"deleted": True}
 
 @router.post("/{recipe_id}/photo")
@@ -120,27 +212,22 @@ def upload_recipe_photo(
     recipe_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
 ):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-
-    if not recipe or recipe.created_by != current_user.id:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="File must be an image")
-
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-
-    ext = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    filepath = os.path.join(upload_dir, filename)
-
-    with open(filepath, "wb") as buffer:
-        buffer.write(file.file.read())
-
-    recipe.photo_url = filepath
+    # Stored before the ownership check, which is the UPDATE itself; a 404
+    # removes the file again if this request created it.
+    filepath, created = store_upload(file, settings.MAX_UPLOAD_BYTES)
+
+    row = db.execute(recipe_writes.photo_statement(user_id, recipe_id, filepath)).first()
+    if row is None:
+        discard_upload(filepath, created)
+    row = recipe_writes.found(row)
+    # queued in the same transaction: the job exists iff the photo was saved
+    derivatives = jobs.enqueue_statement(db.get_bind().dialect.name, "derivatives", {"path": filepath}, key=filepath)
+    db.execute(derivatives)
     db.commit()
+    jobs.notify()
+    feed_cache.invalidate_if_public(row.is_public)
 
-    return {"photo_url": filepath}
+    # the variants follow once the derivatives job has written them
+    return {"photo_url": filepath, "photo_variants": None}
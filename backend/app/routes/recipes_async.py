@@ -0,0 +1,238 @@
+"""Async variants of the recipe routes, mounted instead of
+``app.routes.recipes`` when ``DB_ASYNC`` is enabled."""
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.conditional import (
+    is_not_modified,
+    not_modified,
+    page_validators,
+    recipe_validators,
+)
+from app.core.pagination import finish_page, page_statement, probe_statement
+from app.db.database import AsyncSessionLocal, get_async_db
+from app.models.models import Recipe
+from app.core.responses import JSONBytesResponse
+from app.schemas.common import Page
+from app.schemas.recipe import (
+    BatchResult,
+    RecipeBatch,
+    RecipeBatchDelete,
+    RecipeBatchUpdate,
+    RecipeCreate,
+    RecipeFields,
+    RecipeOut,
+    RecipeSummary,
+    RecipeUpdate,
+)
+from app.core.deps import get_current_user_id_async, get_read_db_async
+from app.core.config import settings
+from app.services import feed_cache, jobs, recipe_index, recipe_writes
+from app.services.batch import (
+    batch_changes,
+    batch_results,
+    check_ids,
+    delete_statement,
+    parse_ids,
+    render_batch,
+    update_statement,
+)
+from app.services.bulk import export_line, export_statement, import_rows, prepare_import, read_body
+from app.services.projection import load_options, parse_fields, render_page
+from app.services.storage import discard_upload, store_upload
+
+from fastapi import UploadFile, File
+
+router = APIRouter(prefix="/recipes", tags=["recipes"])
+
+
+@router.post("", response_model=RecipeOut)
+async def create_recipe(
+    payload: RecipeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    row = (await db.execute(recipe_writes.insert_statement(user_id, payload.model_dump()))).one()
+    await db.commit()
+    feed_cache.invalidate_if_public(row.is_public)
+    recipe_index.record(row)
+    return row
+
+
+@router.get("", response_model=Page[RecipeSummary | RecipeFields] | RecipeBatch, response_class=JSONBytesResponse)
+async def list_my_recipes(
+    request: Request,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: str | None = None,
+    fields: str | None = None,
+    ids: str | None = None,
+    db: AsyncSession = Depends(get_read_db_async),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    limit = max(1, min(limit, 50))
+    fields = parse_fields(fields)
+    offset = 0 if cursor else max(0, offset)
+
+    base = select(Recipe).where(Recipe.created_by == user_id)
+    if ids is not None:
+        ids = parse_ids(ids, settings.RECIPE_BATCH_MAX_IDS)
+        base = base.where(Recipe.id.in_(ids))
+
+    total, last_modified = (await db.execute(probe_statement(base))).one()
+    key = (user_id, ids, fields) if ids is not None else (user_id, limit, offset, cursor, fields)
+    headers = page_validators(key, total, last_modified, "private, no-cache")
+    if is_not_modified(request.headers, headers["ETag"]):
+        return not_modified(headers)
+
+    if ids is not None:
+        items = (await db.execute(base.options(*load_options(fields)))).scalars().all()
+        return JSONBytesResponse(render_batch(ids, items, fields), headers=headers)
+
+    page = page_statement(base.options(*load_options(fields)), Recipe.id, limit, offset, cursor)
+    rows = (await db.execute(page)).all()
+    items, next_cursor = finish_page(rows, Recipe.id, limit)
+
+    meta = {"limit": limit, "offset": offset, "total": total, "next_cursor": next_cursor}
+    return JSONBytesResponse(render_page(meta, items, fields), headers=headers)
+
+
+@router.post("/bulk")
+async def bulk_import_recipes(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    body = await read_body(request, settings.BULK_MAX_BYTES)
+    content_type = request.headers.get("content-type", "")
+    # run_sync() runs its function on the event loop, so only the insert goes there
+    rows, errors = await run_in_threadpool(prepare_import, body, content_type, user_id, settings.BULK_MAX_ROWS)
+    return await db.run_sync(import_rows, rows, errors)
+
+
+@router.get("/export")
+async def export_recipes(user_id: int = Depends(get_current_user_id_async)):
+    # The stream outlives the request's session, so it opens its own.
+    async def lines():
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(export_statement(select(Recipe).where(Recipe.created_by == user_id)))
+            async for chunk in result.scalars().partitions():
+                yield "".join(export_line(r) for r in chunk)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="recipes.ndjson"'},
+    )
+
+
+# Declared before the /{recipe_id} routes, which would take "batch" as an id.
+@router.patch("/batch", response_model=BatchResult)
+async def update_recipes_batch(
+    payload: RecipeBatchUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    ids = check_ids(payload.ids, settings.RECIPE_BATCH_MAX_IDS)
+    changes = batch_changes(payload.changes)
+
+    rows = (await db.execute(update_statement(user_id, ids, changes))).all()
+    await db.commit()
+    if rows:
+        feed_cache.invalidate_if_public("is_public" in changes, *(row.is_public for row in rows))
+        recipe_index.poke()
+    return batch_results(ids, {row.id for row in rows}, "updated")
+
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_recipes_batch(
+    payload: RecipeBatchDelete,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    ids = check_ids(payload.ids, settings.RECIPE_BATCH_MAX_IDS)
+
+    rows = (await db.execute(delete_statement(user_id, ids))).all()
+    await db.commit()
+    feed_cache.invalidate_if_public(*(row.is_public for row in rows))
+    for row in rows:
+        recipe_index.discard(row.id)
+    return batch_results(ids, {row.id for row in rows}, "deleted")
+
+
+@router.get("/{recipe_id}", response_model=RecipeOut)
+async def get_recipe(
+    recipe_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db_async),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    recipe = await db.get(Recipe, recipe_id)
+    if not recipe or recipe.created_by != user_id:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    headers = recipe_validators(recipe)
+    if is_not_modified(request.headers, headers["ETag"], recipe.updated_at):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return recipe
+
+
+@router.put("/{recipe_id}", response_model=RecipeOut)
+async def update_recipe(
+    recipe_id: int,
+    payload: RecipeUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    data = payload.model_dump(exclude_unset=True)
+    row = recipe_writes.found((await db.execute(recipe_writes.update_statement(user_id, recipe_id, data))).first())
+    await db.commit()
+    # RETURNING has the new values only; the old visibility differs only if it was set
+    feed_cache.invalidate_if_public("is_public" in data, row.is_public)
+    recipe_index.record(row)
+    return row
+
+
+@router.delete("/{recipe_id}")
+async def delete_recipe(
+    recipe_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    row = recipe_writes.found((await db.execute(recipe_writes.delete_statement(user_id, recipe_id))).first())
+    await db.commit()
+    feed_cache.invalidate_if_public(row.is_public)
+    recipe_index.discard(recipe_id)
+    return {"deleted": True}
+
+
+@router.post("/{recipe_id}/photo")
+async def upload_recipe_photo(
+    recipe_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    # Stored before the ownership check, which is the UPDATE itself; a 404
+    # removes the file again if this request created it. File I/O stays off
+    # the event loop.
+    filepath, created = await run_in_threadpool(store_upload, file, settings.MAX_UPLOAD_BYTES)
+
+    row = (await db.execute(recipe_writes.photo_statement(user_id, recipe_id, filepath))).first()
+    if row is None:
+        await run_in_threadpool(discard_upload, filepath, created)
+    row = recipe_writes.found(row)
+    # queued in the same transaction: the job exists iff the photo was saved
+    derivatives = jobs.enqueue_statement(db.bind.dialect.name, "derivatives", {"path": filepath}, key=filepath)
+    await db.execute(derivatives)
+    await db.commit()
+    jobs.notify()
+    feed_cache.invalidate_if_public(row.is_public)
+
+    # the variants follow once the derivatives job has written them
+    return {"photo_url": filepath, "photo_variants": None}
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user_id, get_read_db
+from app.schemas.user import UserStats
+from app.services.user_stats import stats_statement, summarize
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/me/stats", response_model=UserStats)
+def my_stats(
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    return summarize(db.execute(stats_statement(user_id)).scalars())
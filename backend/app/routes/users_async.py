@@ -0,0 +1,18 @@
+"""Async variants of the user routes, mounted instead of
+``app.routes.users`` when ``DB_ASYNC`` is enabled."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_current_user_id_async, get_read_db_async
+from app.schemas.user import UserStats
+from app.services.user_stats import stats_statement, summarize
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/me/stats", response_model=UserStats)
+async def my_stats(
+    db: AsyncSession = Depends(get_read_db_async),
+    user_id: int = Depends(get_current_user_id_async),
+):
+    return summarize((await db.execute(stats_statement(user_id))).scalars())
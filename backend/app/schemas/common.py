@@ -1,10 +1,15 @@
+from typing import Generic, TypeVar
+
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
 class PageMeta(BaseModel):
     limit: int
     offset: int
     total: int
+    next_cursor: str | None = None
 
-class Page(BaseModel):
+class Page(BaseModel, Generic[T]):
     meta: PageMeta
-    items: list
\ No newline at end of file
+    items: list[T]
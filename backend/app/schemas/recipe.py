@@ -1,4 +1,8 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, computed_field, create_model
+
+from app.core.photos import variant_urls
 
 # -------- Create --------
 class RecipeCreate(BaseModel):
@@ -64,6 +68,150 @@ class RecipeOut(BaseModel):
     rating: int | None
     review: str | None
     photo_url: str | None
+    photo_derived: bool = Field(default=False, exclude=True)
+
+    @computed_field
+    @property
+    def photo_variants(self) -> dict[str, dict[str, str]] | None:
+        # thumb/medium x webp/jpg, null until written in the background
+        return variant_urls(self.photo_url, self.photo_derived)
 
     class Config:
         from_attributes = True
+
+
+# -------- List item --------
+class RecipeSummary(BaseModel):
+    """Card-sized recipe for list endpoints; the long Text columns are left out."""
+    id: int
+    title: str
+    author: str | None
+    cook_time: int | None
+    cuisine: str | None
+    difficulty: str | None
+    is_public: bool
+    calories: int | None
+    protein_g: int | None
+    carbs_g: int | None
+    fat_g: int | None
+    rating: int | None
+    review_excerpt: str | None
+    photo_url: str | None
+    photo_derived: bool = Field(default=False, exclude=True)
+
+    @computed_field
+    @property
+    def photo_variants(self) -> dict[str, dict[str, str]] | None:
+        return variant_urls(self.photo_url, self.photo_derived)
+
+    class Config:
+        from_attributes = True
+
+
+# -------- Sparse list item (?fields=) --------
+# Lists answer ``fields=a,b`` with ``id`` plus just those fields; this is
+# that shape for the OpenAPI schema (responses are encoded without it).
+RecipeFields = create_model(
+    "RecipeFields",
+    __doc__="List item under ``?fields=``: ``id`` plus the requested fields only.",
+    id=(int, ...),
+    **{
+        name: (field.annotation, None)
+        for name, field in RecipeOut.model_fields.items()
+        if name not in ("id", "photo_derived")
+    },
+    photo_variants=(dict[str, dict[str, str]] | None, None),
+    review_excerpt=(str | None, None),
+)
+
+
+# -------- Batch --------
+class RecipeBatch(BaseModel):
+    """``GET /recipes?ids=``: the caller's recipes among ``ids``, in request order."""
+    items: list[RecipeSummary | RecipeFields]
+    missing: list[int]
+
+
+class RecipeBatchUpdate(BaseModel):
+    ids: list[int] = Field(min_length=1)
+    changes: RecipeUpdate
+
+
+class RecipeBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1)
+
+
+class BatchItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class BatchResult(BaseModel):
+    count: int
+    results: list[BatchItemResult]
+
+
+# -------- Feed facets --------
+class FacetValue(BaseModel):
+    value: str | int | None  # None counts recipes without a value
+    count: int
+
+
+class FacetRange(BaseModel):
+    # inclusive bounds; max=None is open-ended, min=max=None counts missing values
+    min: int | None
+    max: int | None
+    count: int
+
+
+class FeedFacets(BaseModel):
+    total: int
+    cuisine: list[FacetValue]
+    difficulty: list[FacetValue]
+    rating: list[FacetValue]
+    cook_time: list[FacetRange]
+    calories: list[FacetRange]
+    protein_g: list[FacetRange]
+
+
+# -------- Similar recipes --------
+class SimilarRecipe(RecipeSummary):
+    score: float  # weighted cosine similarity, 1 is identical
+
+
+class SimilarRecipeFields(RecipeFields):
+    score: float
+
+
+class SimilarMeta(BaseModel):
+    recipe_id: int
+    limit: int
+
+
+class SimilarPage(BaseModel):
+    meta: SimilarMeta
+    items: list[SimilarRecipe | SimilarRecipeFields]
+
+
+# -------- Macro match --------
+class MacroMatch(RecipeSummary):
+    distance: float  # in standard deviations of the requested macros
+
+
+class MacroMatchFields(RecipeFields):
+    distance: float
+
+
+class MacroMatchMeta(BaseModel):
+    calories: float | None
+    protein_g: float | None
+    carbs_g: float | None
+    fat_g: float | None
+    cuisine: str | None
+    max_cook_time: int | None
+    limit: int
+
+
+class MacroMatchPage(BaseModel):
+    meta: MacroMatchMeta
+    items: list[MacroMatch | MacroMatchFields]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
+from app.schemas.recipe import FacetValue
+
 class UserCreate(BaseModel):
     username: str = Field(min_length=3, max_length=50)
     email: EmailStr
@@ -21,3 +23,20 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+class MacroAverages(BaseModel):
+    # None when no recipe has the macro
+    calories: float | None
+    protein_g: float | None
+    carbs_g: float | None
+    fat_g: float | None
+
+class UserStats(BaseModel):
+    total_recipes: int
+    public_recipes: int
+    rated_recipes: int
+    average_rating: float | None
+    rating_histogram: list[FacetValue]  # ratings 1-5, unrated ones not included
+    cuisine: list[FacetValue]
+    difficulty: list[FacetValue]
+    average_macros: MacroAverages
@@ -0,0 +1,82 @@
+"""Multi-select actions on one user's recipes.
+
+``GET /recipes?ids=``, ``PATCH /recipes/batch`` and ``DELETE /recipes/batch``
+each run one set-based statement scoped by ``created_by``, however many ids
+they get, and report per id. Ids that do not exist and ids owned by someone
+else both come back as missing / ``not_found``, like the single-recipe
+routes' 404.
+"""
+import pydantic_core
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+
+from app.models.models import Recipe
+from app.schemas.recipe import RecipeUpdate
+from app.services.projection import dump_items
+
+# columns the database rejects NULL for
+NOT_NULL = ("title", "is_public")
+
+
+def check_ids(ids: list[int], max_ids: int) -> list[int]:
+    """Dedupe ``ids`` (keeping their order) and enforce the batch size."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Give at least one id")
+    if len(ids) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per request")
+    return ids
+
+
+def parse_ids(raw: str, max_ids: int) -> list[int]:
+    """``"3,1,2"`` -> [3, 1, 2]."""
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    return check_ids(ids, max_ids)
+
+
+def batch_changes(payload: RecipeUpdate) -> dict:
+    changes = payload.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
+    for name in NOT_NULL:
+        if name in changes and changes[name] is None:
+            raise HTTPException(status_code=400, detail=f"{name} cannot be null")
+    return changes
+
+
+def update_statement(user_id: int, ids: list[int], changes: dict):
+    # updated_at comes from the column's onupdate
+    return (
+        update(Recipe)
+        .where(Recipe.created_by == user_id, Recipe.id.in_(ids))
+        .values(**changes)
+        .returning(Recipe.id, Recipe.is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_statement(user_id: int, ids: list[int]):
+    return (
+        delete(Recipe)
+        .where(Recipe.created_by == user_id, Recipe.id.in_(ids))
+        .returning(Recipe.id, Recipe.is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def batch_results(ids: list[int], done: set[int], status: str) -> dict:
+    return {
+        "count": len(done),
+        "results": [{"id": i, "status": status if i in done else "not_found"} for i in ids],
+    }
+
+
+def render_batch(ids: list[int], items, fields: tuple[str, ...] | None) -> bytes:
+    """The requested recipes in ``ids`` order, plus the ids that were not found."""
+    by_id = {recipe.id: recipe for recipe in items}
+    found = [by_id[i] for i in ids if i in by_id]
+    missing = [i for i in ids if i not in by_id]
+    return pydantic_core.to_json({"items": dump_items(found, fields), "missing": missing})
@@ -0,0 +1,166 @@
+"""Bulk recipe import/export helpers shared by the sync and async routes.
+
+Imports accept NDJSON (one recipe per line) or a JSON array, validate each
+item with ``RecipeCreate`` and insert every valid row in one transaction:
+Postgres gets a single ``COPY``, other databases a batched multi-row INSERT.
+Per-row errors carry the item's 0-based ``index``: its position in the
+array, or its line in an NDJSON body (blank lines are skipped but counted).
+Bodies over ``BULK_MAX_BYTES`` are refused before they are buffered.
+"""
+import io
+import json
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+from app.models.models import Recipe
+from app.schemas.recipe import RecipeCreate, RecipeOut
+from app.services import feed_cache, recipe_index
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+COLUMNS = ["created_by", *RecipeCreate.model_fields]
+EXPORT_CHUNK = 500
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """The request body, or 413 as soon as it is known to exceed ``max_bytes``."""
+    too_large = HTTPException(status_code=413, detail=f"Import bodies are limited to {max_bytes} bytes")
+    try:
+        declared = int(request.headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if declared > max_bytes:
+        raise too_large
+
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def parse_items(body: bytes, content_type: str, max_rows: int) -> list[tuple[int, object]]:
+    """Split a request body into (index, decoded item) pairs.
+
+    NDJSON items are indexed by physical line, so the index matches the
+    client's file. A malformed NDJSON line becomes that row's error; a
+    malformed JSON array fails the whole request.
+    """
+    if content_type.split(";")[0].strip().lower() in NDJSON_TYPES:
+        items = []
+        for index, line in enumerate(body.splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append((index, json.loads(line)))
+            except ValueError as exc:
+                items.append((index, exc))
+    else:
+        try:
+            decoded = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(decoded, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        items = list(enumerate(decoded))
+
+    if len(items) > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} recipes per import")
+    return items
+
+
+def validate_items(items, user_id: int) -> tuple[list[dict], list[dict]]:
+    """Returns (insertable rows, per-row errors)."""
+    rows, errors = [], []
+    for index, item in items:
+        if isinstance(item, Exception):
+            errors.append({"index": index, "errors": [{"msg": f"Invalid JSON: {item}"}]})
+            continue
+        try:
+            payload = RecipeCreate.model_validate(item)
+        except ValidationError as exc:
+            errors.append({
+                "index": index,
+                "errors": exc.errors(include_url=False, include_context=False, include_input=False),
+            })
+            continue
+        rows.append({"created_by": user_id, **payload.model_dump()})
+    return rows, errors
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(dbapi_connection, rows: list[dict], table: str = "recipes", columns: list[str] = COLUMNS) -> None:
+    """Load ``rows`` into ``table`` with one COPY (psycopg2 connection)."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[c]) for c in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def insert_rows(db, rows: list[dict]) -> None:
+    """Insert ``rows`` and commit, all or nothing (sync Session)."""
+    if not rows:
+        return
+    try:
+        connection = db.connection()
+        if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+            copy_rows(connection.connection.dbapi_connection, rows)
+        else:
+            # executemany: SQLAlchemy batches these into multi-row INSERTs
+            db.execute(insert(Recipe), rows)
+        db.commit()
+    except DBAPIError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Import failed, no recipes were inserted")
+
+
+def prepare_import(body: bytes, content_type: str, user_id: int, max_rows: int) -> tuple[list[dict], list[dict]]:
+    """Parse and validate an import body: (insertable rows, per-row errors).
+
+    CPU-bound on large bodies, so callers run it off the event loop.
+    """
+    return validate_items(parse_items(body, content_type, max_rows), user_id)
+
+
+def import_rows(db, rows: list[dict], errors: list[dict]) -> dict:
+    """Insert prepared rows (sync Session) and build the import result."""
+    insert_rows(db, rows)
+    feed_cache.invalidate_if_public(*(row["is_public"] for row in rows))
+    if rows:
+        recipe_index.poke()  # no ids come back from the insert, so let the catch-up read them
+    return {"inserted": len(rows), "failed": len(errors), "errors": errors}
+
+
+def import_body(db, body: bytes, content_type: str, user_id: int, max_rows: int) -> dict:
+    """Parse, validate and insert an import body (sync Session)."""
+    return import_rows(db, *prepare_import(body, content_type, user_id, max_rows))
+
+
+def export_line(recipe: Recipe) -> str:
+    return RecipeOut.model_validate(recipe).model_dump_json() + "\n"
+
+
+def export_statement(stmt):
+    """Stream ``stmt`` with a server-side cursor in chunks of ``EXPORT_CHUNK`` rows."""
+    return stmt.order_by(Recipe.id).execution_options(yield_per=EXPORT_CHUNK)
+
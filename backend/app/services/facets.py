@@ -0,0 +1,103 @@
+"""Facet counts for ``/feed/facets``.
+
+Counts are read from the ``recipe_facets`` cells (app/db/facets.py) when
+every active filter lines up with the cells: cuisine, min_rating, and the
+cook-time/calorie/protein thresholds when they sit on a bucket edge. A
+search query or an off-edge threshold needs the rows themselves, so those
+requests run one GROUP BY over the filtered feed statement instead, which
+yields the same cells. All filters apply to all facets.
+"""
+from sqlalchemy import func, select
+
+from app.db.facets import CALORIE_EDGES, CELL_COLUMNS, COOK_TIME_EDGES, PROTEIN_EDGES, cell_columns
+from app.models.models import RecipeFacet
+
+# (filter param, cell position, edges, edges are upper bounds)
+THRESHOLDS = (
+    ("max_cook_time", 3, COOK_TIME_EDGES, True),
+    ("max_calories", 4, CALORIE_EDGES, True),
+    ("min_protein", 5, PROTEIN_EDGES, False),
+)
+
+
+def _buckets_for(value: int, edges: tuple, upper: bool) -> range | None:
+    """Bucket indexes that ``value`` selects exactly, or None if it falls inside one."""
+    if upper:  # column <= value
+        if value < 0:
+            return range(0)
+        return range(edges.index(value) + 1) if value in edges else None
+    # column >= value; stored values are never negative
+    if value <= 0:
+        return range(len(edges) + 1)
+    return range(edges.index(value) + 1, len(edges) + 1) if value in edges else None
+
+
+def cell_predicate(params: dict):
+    """Filter over cells equivalent to the feed's SQL filters, or None if there is none."""
+    if params["q"]:
+        return None
+    checks = []
+    cuisine, min_rating = params["cuisine"], params["min_rating"]
+    if cuisine:
+        checks.append(lambda cell: cell[0] == cuisine)
+    if min_rating is not None:
+        checks.append(lambda cell: cell[2] != -1 and cell[2] >= min_rating)
+    for name, position, edges, upper in THRESHOLDS:
+        if params[name] is None:
+            continue
+        buckets = _buckets_for(params[name], edges, upper)
+        if buckets is None:
+            return None
+        checks.append(lambda cell, position=position, buckets=buckets: cell[position] in buckets)
+    return lambda cell: all(check(cell) for check in checks)
+
+
+def facets_statement(params: dict, feed_stmt):
+    """``(statement, predicate)``; rows are (six cell keys, count), to be filtered
+    by ``predicate`` when it is not None."""
+    predicate = cell_predicate(params)
+    if predicate is not None:
+        keys = [getattr(RecipeFacet, name) for name in CELL_COLUMNS]
+        return select(*keys, RecipeFacet.recipe_count).where(RecipeFacet.recipe_count > 0), predicate
+    columns = cell_columns()
+    return feed_stmt.with_only_columns(*columns, func.count()).group_by(*columns), None
+
+
+def _ranges(counts: dict, edges: tuple, upper: bool) -> list[dict]:
+    ranges = []
+    for i in range(len(edges) + 1):
+        if upper:
+            low = edges[i - 1] + 1 if i else 0
+            high = edges[i] if i < len(edges) else None
+        else:
+            low = edges[i - 1] if i else 0
+            high = edges[i] - 1 if i < len(edges) else None
+        ranges.append({"min": low, "max": high, "count": counts.get(i, 0)})
+    ranges.append({"min": None, "max": None, "count": counts.get(-1, 0)})
+    return ranges
+
+
+def value_counts(counts: dict, missing) -> list[dict]:
+    items = [{"value": None if v == missing else v, "count": n} for v, n in counts.items() if n]
+    return sorted(items, key=lambda item: (-item["count"], item["value"] is None, str(item["value"])))
+
+
+def summarize(rows, predicate=None) -> dict:
+    dims = [{} for _ in range(6)]
+    total = 0
+    for *cell, count in rows:
+        if predicate is not None and not predicate(cell):
+            continue
+        total += count
+        for dim, key in zip(dims, cell):
+            dim[key] = dim.get(key, 0) + count
+    cuisine, difficulty, rating, cook, calories, protein = dims
+    return {
+        "total": total,
+        "cuisine": value_counts(cuisine, ""),
+        "difficulty": value_counts(difficulty, ""),
+        "rating": sorted(value_counts(rating, -1), key=lambda item: -(item["value"] or 0)),
+        "cook_time": _ranges(cook, COOK_TIME_EDGES, True),
+        "calories": _ranges(calories, CALORIE_EDGES, True),
+        "protein_g": _ranges(protein, PROTEIN_EDGES, False),
+    }
@@ -0,0 +1,56 @@
+"""Response cache for anonymous ``/feed`` pages.
+
+Entries are keyed on the feed version plus the normalized filter tuple.
+Writes that touch a public recipe call ``invalidate()``, which bumps the
+version and drops the cached pages; a request that started before the bump
+stores its result under the old version, where it is never read again.
+The version lives in this process only, so with several workers the TTL
+bounds how stale another worker's pages can get.
+"""
+import threading
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+cache = TTLCache(
+    max_entries=settings.FEED_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FEED_CACHE_TTL_SECONDS,
+)
+
+_version = 0
+_version_lock = threading.Lock()
+invalidations = 0
+last_invalidated = float("-inf")  # time.monotonic() of the last invalidate()
+
+
+def current_version() -> int:
+    return _version
+
+
+def invalidate() -> None:
+    global _version, invalidations, last_invalidated
+    with _version_lock:
+        _version += 1
+        invalidations += 1
+        last_invalidated = time.monotonic()
+    cache.clear()
+
+
+def invalidated_within(seconds: float) -> bool:
+    return time.monotonic() - last_invalidated < seconds
+
+
+def invalidate_if_public(*was_or_is_public: bool) -> None:
+    """Invalidate when any of the given visibility flags is set."""
+    if any(was_or_is_public):
+        invalidate()
+
+
+def stats() -> dict:
+    return {
+        "enabled": settings.FEED_CACHE_ENABLED,
+        "version": _version,
+        "invalidations": invalidations,
+        **cache.stats(),
+    }
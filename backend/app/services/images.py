@@ -0,0 +1,152 @@
+"""Resized WebP/JPEG derivatives of uploaded photos.
+
+Every stored photo gets a square ``thumb`` and a bounded ``medium`` variant
+in both formats under ``uploads/derived/``, named after the original file
+so their URLs can be derived from ``photo_url`` alone. Encoding runs on a
+process pool, as a ``derivatives`` job (app/services/jobs.py) queued by
+the upload; it strips EXIF (after applying its orientation), writes
+progressive JPEGs and replaces files atomically, so it is safe to re-run.
+Once they are written the job sets ``recipes.photo_derived``, and only
+then do responses carry the variant URLs. Backfill existing uploads with:
+
+    python -m app.services.images backfill
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.core.photos import FORMATS, UPLOAD_DIR, VARIANTS
+
+logger = logging.getLogger(__name__)
+
+DERIVED_DIR = os.path.join(UPLOAD_DIR, "derived")
+
+
+def variant_path(photo_path: str, variant: str, fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(photo_path))[0]
+    return os.path.join(DERIVED_DIR, stem[:2], f"{stem}-{variant}.{fmt}")
+
+
+def generate_derivatives(photo_path: str, force: bool = False) -> list[str]:
+    """Write every missing variant of ``photo_path``; returns the paths written."""
+    from PIL import Image, ImageOps
+
+    targets = {
+        (variant, fmt): variant_path(photo_path, variant, fmt)
+        for variant in VARIANTS
+        for fmt in FORMATS
+    }
+    if not force and all(os.path.exists(p) for p in targets.values()):
+        return []
+
+    written = []
+    with Image.open(photo_path) as original:
+        image = ImageOps.exif_transpose(original)
+        image.info.pop("exif", None)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        for variant, (box, crop) in VARIANTS.items():
+            if crop:
+                resized = ImageOps.fit(image, box, Image.Resampling.LANCZOS)
+            else:
+                resized = image.copy()
+                resized.thumbnail(box, Image.Resampling.LANCZOS)
+
+            for fmt in FORMATS:
+                path = targets[(variant, fmt)]
+                if not force and os.path.exists(path):
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                if fmt == "jpg":
+                    resized.convert("RGB").save(
+                        tmp_path, "JPEG", quality=82, progressive=True, optimize=True, exif=b""
+                    )
+                else:
+                    resized.save(tmp_path, "WEBP", quality=80, method=4, exif=b"")
+                os.replace(tmp_path, path)
+                written.append(path)
+    return written
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def derive(photo_path: str) -> list[str]:
+    """Generate the derivatives on the process pool and wait for them (the
+    ``derivatives`` job, see app/services/jobs.py)."""
+    global _pool
+    pool = _get_pool()
+    try:
+        return pool.submit(generate_derivatives, photo_path).result()
+    except BrokenProcessPool:
+        # a worker died; the job's retry gets a fresh pool
+        if _pool is pool:
+            _pool = None
+        raise
+
+
+def mark_derived(engine, photo_paths: list[str]) -> None:
+    """Set ``photo_derived`` on the recipes showing ``photo_paths``."""
+    from app.services import feed_cache, recipe_writes
+
+    if not photo_paths:
+        return
+    with engine.begin() as conn:
+        public = conn.execute(recipe_writes.derived_statement(photo_paths)).scalars().all()
+    # this process's feed pages; the others expire with FEED_CACHE_TTL_SECONDS
+    feed_cache.invalidate_if_public(*public)
+
+
+def backfill(force: bool = False) -> None:
+    from sqlalchemy import select
+
+    from app.db.database import SessionLocal, engine
+    from app.models.models import Recipe
+
+    with SessionLocal() as db:
+        paths = db.execute(
+            select(Recipe.photo_url).where(Recipe.photo_url.is_not(None)).distinct()
+        ).scalars().all()
+
+    pool = _get_pool()
+    futures = {pool.submit(generate_derivatives, p, force): p for p in paths if os.path.exists(p)}
+    done = failed = 0
+    derived = []
+    for future, path in futures.items():
+        try:
+            done += bool(future.result())
+            derived.append(path)
+        except Exception as exc:
+            failed += 1
+            logger.error("Derivatives failed for %s: %r", path, exc)
+    mark_derived(engine, derived)
+    logger.info("Backfill: %d photos, %d regenerated, %d failed", len(futures), done, failed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--force", action="store_true", help="re-encode existing variants too")
+    args = parser.parse_args()
+
+    setup_logging()
+    backfill(force=args.force)
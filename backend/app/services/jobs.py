@@ -0,0 +1,317 @@
+"""Durable background jobs, queued in the ``jobs`` table.
+
+A route queues a job with ``enqueue_statement()`` in its own transaction,
+so the job exists exactly when the write it follows was committed, then
+calls ``notify()`` to wake this process's workers. Workers (``JOB_WORKERS``
+threads started from the app's lifespan, or a separate process:
+
+    python -m app.services.jobs [workers]
+
+) claim one due job at a time with ``UPDATE ... RETURNING`` (``FOR UPDATE
+SKIP LOCKED`` on Postgres, SQLite's write lock otherwise), so any number
+of processes can share the table. A failed attempt is retried with
+exponential backoff and jitter until ``max_attempts``, then left as
+``failed``. A job still running after ``JOB_LEASE_SECONDS`` is assumed
+abandoned by a dead worker and claimed again, so handlers must be safe to
+run twice; one whose lease expires on its last attempt (it keeps killing
+its worker) is marked ``failed`` instead.
+
+An idempotency key names at most one queued job: enqueueing the same key
+again while one waits is a no-op, but once a worker has claimed it a new
+run is queued, so a job always runs after the last write that queued it
+(a photo re-uploaded while its derivatives are being made is marked
+derived again). ``PERIODIC`` jobs are queued that way by every process,
+keyed by kind and interval slot, so each runs about once per interval
+across all of them.
+"""
+import logging
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from datetime import timedelta, timezone
+
+from sqlalchemy import and_, delete, func, insert, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.models import Job, utcnow
+
+logger = logging.getLogger(__name__)
+
+_QUEUED_SQL = text("status = 'queued'")
+
+
+# ---------- queueing ----------
+def enqueue_statement(dialect: str, kind: str, payload: dict | None = None, key: str | None = None, delay: float = 0):
+    """INSERT for one job, due after ``delay`` seconds; skipped if ``key`` is queued."""
+    values = {
+        "kind": kind,
+        "payload": payload or {},
+        "idempotency_key": key,
+        "max_attempts": settings.JOB_MAX_ATTEMPTS,
+        "run_at": utcnow() + timedelta(seconds=delay),
+    }
+    if key is None:
+        return insert(Job).values(**values)
+    dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return dialect_insert(Job).values(**values).on_conflict_do_nothing(
+        index_elements=[Job.idempotency_key], index_where=_QUEUED_SQL
+    )
+
+
+def enqueue(engine, kind: str, payload: dict | None = None, key: str | None = None, delay: float = 0) -> None:
+    """Queue a job in its own transaction, for callers outside a request."""
+    with engine.begin() as conn:
+        conn.execute(enqueue_statement(engine.dialect.name, kind, payload, key, delay))
+    notify()
+
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number ``attempts``: capped exponential, jittered to 50-100%."""
+    delay = min(settings.JOB_BACKOFF_MAX_SECONDS, settings.JOB_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+# ---------- handlers ----------
+def prune(payload: dict) -> None:
+    """Delete finished jobs older than ``JOB_RETENTION_SECONDS``."""
+    from app.db.database import engine
+
+    cutoff = utcnow() - timedelta(seconds=settings.JOB_RETENTION_SECONDS)
+    with engine.begin() as conn:
+        pruned = conn.execute(delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff))
+    if pruned.rowcount:
+        logger.info("Pruned %d finished jobs", pruned.rowcount)
+
+
+def _derivatives(payload: dict) -> None:
+    from app.db.database import engine
+    from app.services.images import derive, mark_derived
+
+    derive(payload["path"])
+    mark_derived(engine, [payload["path"]])
+
+
+def _sweep_uploads(payload: dict) -> None:
+    from app.db.database import engine
+    from app.services.orphans import sweep
+
+    sweep(engine, settings.UPLOAD_SWEEP_GRACE_SECONDS)
+
+
+# kind -> fn(payload); add new kinds here
+HANDLERS = {
+    "derivatives": _derivatives,
+    "sweep_uploads": _sweep_uploads,
+    "prune_jobs": prune,
+}
+# kind -> seconds between runs
+PERIODIC = {
+    "sweep_uploads": settings.UPLOAD_SWEEP_SECONDS,
+    "prune_jobs": 3600.0,
+}
+
+
+# ---------- workers ----------
+def _claim_statement(worker: str):
+    now = utcnow()
+    due = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        and_(
+            Job.status == "running",
+            Job.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            Job.attempts < Job.max_attempts,
+        ),
+    )
+    oldest = select(Job.id).where(due).order_by(Job.run_at).limit(1).with_for_update(skip_locked=True)
+    return (
+        update(Job)
+        .where(Job.id == oldest.scalar_subquery())
+        .values(status="running", locked_at=now, locked_by=worker, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+    )
+
+
+def _expire_statement():
+    # lease expired on the last attempt: _claim_statement won't take it again
+    now = utcnow()
+    return (
+        update(Job)
+        .where(
+            Job.status == "running",
+            Job.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            Job.attempts >= Job.max_attempts,
+        )
+        .values(status="failed", last_error="Lease expired on the last attempt", finished_at=now)
+        .returning(Job.id, Job.kind, Job.attempts)
+    )
+
+
+def expire(engine) -> int:
+    """Mark jobs abandoned on their last attempt as ``failed``; returns how many."""
+    with engine.begin() as conn:
+        expired = conn.execute(_expire_statement()).all()
+    for job in expired:
+        logger.error("Job %d (%s) failed for good after %d attempts: lease expired", job.id, job.kind, job.attempts)
+        metrics.JOB_RUNS.inc(job.kind, "failed")
+    return len(expired)
+
+
+def _finish(engine, job, worker: str, **values) -> None:
+    # a worker that lost its lease must not overwrite the new owner's state
+    with engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job.id, Job.locked_by == worker).values(**values))
+
+
+def run_one(engine, worker: str) -> bool:
+    """Claim and run one due job; False when there was none."""
+    with engine.begin() as conn:
+        job = conn.execute(_claim_statement(worker)).first()
+    if job is None:
+        return False
+
+    # SQLite hands back naive UTC
+    run_at = job.run_at if job.run_at.tzinfo else job.run_at.replace(tzinfo=timezone.utc)
+    metrics.JOB_WAIT_SECONDS.observe(max(0.0, (utcnow() - run_at).total_seconds()), job.kind)
+    started = time.perf_counter()
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        handler(job.payload)
+    except Exception as exc:
+        metrics.JOB_SECONDS.observe(time.perf_counter() - started, job.kind)
+        error = f"{type(exc).__name__}: {exc}"[:2000]
+        if job.attempts < job.max_attempts:
+            delay = backoff(job.attempts)
+            try:
+                _finish(
+                    engine, job, worker, status="queued", last_error=error, locked_by=None, locked_at=None,
+                    run_at=utcnow() + timedelta(seconds=delay),
+                )
+            except IntegrityError:
+                # a newer run of the same key was queued meanwhile and does this one's work
+                logger.warning("Job %d (%s) failed, superseded by a queued run: %s", job.id, job.kind, error)
+                metrics.JOB_RUNS.inc(job.kind, "failed")
+                _finish(engine, job, worker, status="failed", last_error=f"{error} (superseded)", finished_at=utcnow())
+            else:
+                logger.warning("Job %d (%s) failed, retry in %.0fs: %s", job.id, job.kind, delay, error)
+                metrics.JOB_RUNS.inc(job.kind, "retry")
+        else:
+            logger.error("Job %d (%s) failed for good after %d attempts: %s", job.id, job.kind, job.attempts, error)
+            metrics.JOB_RUNS.inc(job.kind, "failed")
+            _finish(engine, job, worker, status="failed", last_error=error, finished_at=utcnow())
+        return True
+
+    metrics.JOB_SECONDS.observe(time.perf_counter() - started, job.kind)
+    metrics.JOB_RUNS.inc(job.kind, "done")
+    _finish(engine, job, worker, status="done", finished_at=utcnow())
+    return True
+
+
+_wake = threading.Event()
+_stop = threading.Event()
+_threads: list[threading.Thread] = []
+_threads_lock = threading.Lock()
+
+
+def notify() -> None:
+    """Wake this process's workers now instead of at their next poll."""
+    _wake.set()
+
+
+def _schedule(engine) -> None:
+    # Due at the next multiple of the interval and keyed by it, so all
+    # processes queue the same job and only the first insert lands; a run
+    # still pending from the previous slot doesn't hold this one back.
+    now = time.time()
+    for kind, every in PERIODIC.items():
+        slot = int(now // every) + 1
+        with engine.begin() as conn:
+            conn.execute(
+                enqueue_statement(engine.dialect.name, kind, key=f"{kind}:{slot}", delay=slot * every - now)
+            )
+
+
+def _work(engine, worker: str, scheduler: bool) -> None:
+    next_schedule = 0.0
+    while not _stop.is_set():
+        try:
+            if scheduler and time.monotonic() >= next_schedule:
+                _schedule(engine)
+                expire(engine)
+                next_schedule = time.monotonic() + min(PERIODIC.values())
+            if run_one(engine, worker):
+                continue
+        except Exception:
+            logger.exception("Job worker %s failed", worker)
+        _wake.wait(settings.JOB_POLL_SECONDS)
+        _wake.clear()
+
+
+def start(workers: int | None = None) -> None:
+    """Start the worker threads (idempotent); the first one also queues ``PERIODIC``
+    jobs and fails expired ones."""
+    from app.db.database import engine
+
+    count = settings.JOB_WORKERS if workers is None else workers
+    with _threads_lock:
+        if _threads or count <= 0:
+            return
+        _stop.clear()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(count):
+            thread = threading.Thread(
+                target=_work, args=(engine, f"{prefix}:{i}", i == 0), name=f"job-worker-{i}", daemon=True
+            )
+            thread.start()
+            _threads.append(thread)
+
+
+def stop(timeout: float = 5.0) -> None:
+    """Let running jobs finish (up to ``timeout``) and stop the workers."""
+    with _threads_lock:
+        _stop.set()
+        _wake.set()
+        for thread in _threads:
+            thread.join(timeout)
+        _threads.clear()
+
+
+def _pending(status: str):
+    def count():
+        from app.db.database import engine
+
+        try:
+            with engine.connect() as conn:
+                return conn.scalar(select(func.count()).select_from(Job).where(Job.status == status))
+        except Exception:  # no jobs table yet, database down: skip the sample
+            return None
+    return count
+
+
+metrics.CallbackGauge("jobs_queued", "Jobs waiting to run, due or not.", _pending("queued"))
+metrics.CallbackGauge("jobs_running", "Jobs claimed by a worker.", _pending("running"))
+
+
+def main() -> None:
+    from app.core.logging import setup_logging
+
+    setup_logging()
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(settings.JOB_WORKERS, 1)
+    start(workers)
+    logger.info("Running %d job workers", workers)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Nearest-macro search for ``/feed/macro-match``.
+
+One row per public recipe: calories, protein_g, carbs_g, fat_g, cook_time
+and a cuisine code, stored column-major so a query only reads the columns
+it uses. The cuisine and ``max_cook_time`` filters narrow the rows first;
+the distance is then Euclidean over the requested macros, each difference
+divided by that macro's standard deviation across public recipes (refit on
+every rebuild), so 1.0 is one typical spread. Recipes missing a requested
+macro never match.
+"""
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import recipe_index
+
+MACROS = ("calories", "protein_g", "carbs_g", "fat_g")
+COOK_TIME, CUISINE = len(MACROS), len(MACROS) + 1
+# extra hits fetched for the ones the database no longer has public
+SLACK = 10
+
+
+def smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` smallest non-NaN ``values``, smallest first.
+
+    The k-th smallest of a strided sample bounds the k-th smallest overall
+    from above, so only values under it need sorting; a full argpartition
+    over 10^6 values costs more than the whole distance computation.
+    """
+    if k <= 0:
+        return np.empty(0, np.intp)
+    candidates = None
+    if len(values) > 64 * k:
+        bound = np.partition(values[::len(values) // (32 * k)], k - 1)[k - 1]
+        if not np.isnan(bound):  # NaNs sort last: the sample had k values
+            candidates = np.flatnonzero(values <= bound)
+    if candidates is None:
+        candidates = np.flatnonzero(~np.isnan(values))
+    # ties on integer macros can leave many candidates at the bound
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(values[candidates], k - 1)[:k]]
+    return candidates[np.argsort(values[candidates], kind="stable")]
+
+
+class MacroIndex(recipe_index.RecipeIndex):
+    name = "macro"
+    columns = (*MACROS, "cook_time", "cuisine")
+    dims = len(MACROS) + 2
+    order = "F"
+    blank = np.nan  # a tombstone matches no filter and has no distance
+
+    def __init__(self):
+        super().__init__()
+        self._cuisines: dict[str, int] = {}  # exact cuisine -> code, like the feed's filter
+        self._cuisines_lock = threading.Lock()
+
+    def _cuisine_code(self, cuisine: str | None) -> float:
+        if cuisine is None:
+            return np.nan
+        code = self._cuisines.get(cuisine)
+        if code is None:
+            with self._cuisines_lock:
+                code = self._cuisines.setdefault(cuisine, len(self._cuisines))
+        return code
+
+    def fit(self, sample) -> dict:
+        _, std = recipe_index.column_stats(sample, MACROS)
+        return {"scale": (1 / np.where(std > 0, std, 1)).astype(np.float32)}
+
+    def encode(self, model, rows) -> np.ndarray:
+        return np.array(
+            [[*(getattr(r, m) for m in MACROS), r.cook_time, self._cuisine_code(r.cuisine)] for r in rows],
+            np.float32,
+        ).reshape(-1, self.dims)
+
+    def nearest(self, targets: dict, cuisine: str | None, max_cook_time: int | None, k: int) -> list[tuple[int, float]]:
+        """Up to ``k`` (recipe id, distance) pairs nearest ``targets``, nearest first."""
+        state = self.snapshot()
+        matrix, ids = state.matrix[:state.size], state.ids[:state.size]
+
+        mask = None
+        if cuisine is not None:
+            code = self._cuisines.get(cuisine)
+            if code is None:
+                return []
+            mask = matrix[:, CUISINE] == code
+        if max_cook_time is not None:
+            quick = matrix[:, COOK_TIME] <= max_cook_time
+            mask = quick if mask is None else np.logical_and(mask, quick, out=mask)
+        rows = None if mask is None else np.flatnonzero(mask)
+
+        distance, diff = None, None
+        for column, name in enumerate(MACROS):
+            if targets.get(name) is None:
+                continue
+            values = matrix[:, column] if rows is None else matrix[rows, column]
+            # two buffers for the whole loop: temporaries cost more than the math
+            diff = np.subtract(values, np.float32(targets[name]), out=diff)
+            diff *= state.model["scale"][column]
+            if distance is None:
+                distance = np.square(diff)
+            else:
+                distance += np.square(diff, out=diff)
+        best = smallest(distance, k)
+        positions = best if rows is None else rows[best]
+        hits = zip(ids[positions].tolist(), np.sqrt(distance[best]).tolist())
+        # a row buried while we scanned comes back as -1
+        return [(recipe_id, d) for recipe_id, d in hits if recipe_id >= 0]
+
+
+index = MacroIndex()
+if settings.MACRO_MATCH_ENABLED:
+    recipe_index.register(index)
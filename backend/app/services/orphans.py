@@ -0,0 +1,89 @@
+"""Deletes uploads that no recipe references any more.
+
+Photos are content-addressed and may be shared, so deleting a recipe or
+replacing its photo cannot remove the old file on the spot. The
+``sweep_uploads`` job (app/services/jobs.py) instead compares what is on
+disk with ``recipes.photo_url`` and removes, under ``uploads/``:
+
+* ``<xx>/<sha>.<ext>`` photos no recipe points at, with their derivatives;
+* ``derived/<xx>/`` files whose photo no recipe points at;
+* ``.tmp/`` leftovers of interrupted uploads.
+
+Only files older than the grace period are touched, which covers uploads
+still waiting for their UPDATE to commit (``store_upload`` refreshes the
+mtime of a photo it deduplicates against, for the same reason). Files
+outside this layout are left alone. It has to run on the host that holds
+``uploads/``. To sweep by hand:
+
+    python -m app.services.orphans
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.models import Recipe
+from app.services.images import DERIVED_DIR
+from app.services.storage import TMP_DIR, UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def _files(directory: str):
+    """(path, mtime) of the files in ``directory``'s two-character shard dirs."""
+    if not os.path.isdir(directory):
+        return
+    for shard in os.scandir(directory):
+        if shard.is_dir() and len(shard.name) == 2:
+            for entry in os.scandir(shard.path):
+                if entry.is_file():
+                    yield entry.path, entry.stat().st_mtime
+
+
+def _remove(path: str, cutoff: float) -> bool:
+    try:
+        if os.stat(path).st_mtime >= cutoff:  # touched since it was listed
+            return False
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def sweep(engine, grace_seconds: float) -> dict:
+    """Remove orphaned uploads older than ``grace_seconds``; returns counts per kind."""
+    cutoff = time.time() - grace_seconds
+    with engine.connect() as conn:
+        referenced = set(
+            conn.execute(select(Recipe.photo_url).where(Recipe.photo_url.is_not(None)).distinct()).scalars()
+        )
+    stems = {os.path.splitext(os.path.basename(url))[0] for url in referenced}
+
+    removed = {"photos": 0, "derived": 0, "tmp": 0}
+    for path, mtime in _files(UPLOAD_DIR):
+        if path in referenced or mtime >= cutoff:
+            continue
+        removed["photos"] += _remove(path, cutoff)
+    for path, mtime in _files(DERIVED_DIR):
+        # <sha>-<variant>.<fmt>, or a writer's <...>.<pid>.tmp
+        if os.path.basename(path).partition("-")[0] in stems or mtime >= cutoff:
+            continue
+        removed["derived"] += _remove(path, cutoff)
+    if os.path.isdir(TMP_DIR):
+        for entry in os.scandir(TMP_DIR):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                removed["tmp"] += _remove(entry.path, cutoff)
+
+    if any(removed.values()):
+        logger.info("Upload sweep removed %(photos)d photos, %(derived)d derivatives, %(tmp)d temp files", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+    from app.db.database import engine
+
+    setup_logging()
+    print(sweep(engine, settings.UPLOAD_SWEEP_GRACE_SECONDS))
@@ -0,0 +1,86 @@
+"""Column projection for recipe list endpoints.
+
+Lists return ``RecipeSummary`` by default, which never loads the
+``description``/``instructions``/``review`` Text columns, only a short
+``review_excerpt`` computed in SQL. ``?fields=a,b,c`` picks any other set of
+``RecipeOut`` fields; only the columns those fields need are selected.
+
+Pages are encoded straight from the loaded rows to JSON bytes with
+pydantic-core, without validating each row into a model first.
+"""
+import pydantic_core
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, with_expression
+
+from app.models.models import Recipe
+from app.schemas.recipe import RecipeOut, RecipeSummary
+from app.core.photos import variant_urls
+
+REVIEW_EXCERPT_CHARS = 160
+# photo_derived only feeds photo_variants
+FIELDS = frozenset({*RecipeOut.model_fields, *RecipeOut.model_computed_fields, "review_excerpt"} - {"photo_derived"})
+SUMMARY_FIELDS = tuple(
+    f for f in (*RecipeSummary.model_fields, *RecipeSummary.model_computed_fields) if f != "photo_derived"
+)
+# fields that are not a column of their own -> the column they are derived from
+DERIVED = {"photo_variants": "photo_url", "review_excerpt": "review"}
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """``"title, rating"`` -> ("id", "title", "rating"); None means the summary."""
+    if fields is None or not fields.strip():
+        return None
+    names = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in FIELDS:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+        names.append(name)
+    return tuple(names)
+
+
+def load_options(fields: tuple[str, ...] | None) -> list:
+    """Loader options that fetch only what ``fields`` serializes."""
+    fields = fields or SUMMARY_FIELDS
+    columns = {f for f in fields if f not in DERIVED}
+    if "photo_variants" in fields:
+        columns.update(("photo_url", "photo_derived"))
+    options = [load_only(*(getattr(Recipe, c) for c in columns), raiseload=True)]
+    if "review_excerpt" in fields:
+        options.append(
+            with_expression(Recipe.review_excerpt, func.substr(Recipe.review, 1, REVIEW_EXCERPT_CHARS))
+        )
+    return options
+
+
+def dump_items(items, fields: tuple[str, ...] | None) -> list[dict]:
+    """Rows loaded with ``load_options(fields)`` -> plain dicts.
+
+    Reads the loaded values from the instance ``__dict__``; going through
+    the instrumented attributes costs more than the JSON encoding itself.
+    A field missing from it (not loaded, or expired) goes through the
+    attribute after all, which loads it or, under ``raiseload``, raises.
+    """
+    fields = fields or SUMMARY_FIELDS
+    columns = [f for f in fields if f != "photo_variants"]
+    variants = len(columns) != len(fields)
+    out = []
+    for recipe in items:
+        state = recipe.__dict__
+        try:
+            item = {f: state[f] for f in columns}
+            if variants:
+                item["photo_variants"] = variant_urls(state["photo_url"], state["photo_derived"])
+        except KeyError:
+            item = {f: getattr(recipe, f) for f in columns}
+            if variants:
+                item["photo_variants"] = variant_urls(recipe.photo_url, recipe.photo_derived)
+        out.append(item)
+    return out
+
+
+def render_page(meta: dict, items, fields: tuple[str, ...] | None) -> bytes:
+    return pydantic_core.to_json({"meta": meta, "items": dump_items(items, fields)})
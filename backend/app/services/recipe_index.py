@@ -0,0 +1,411 @@
+"""In-memory NumPy indexes over the public recipes, one copy per worker.
+
+An index holds one float32 row per public recipe. A background thread
+builds it in bulk from the database, then keeps it current:
+
+* the write routes apply their own changes right after commit
+  (``record()`` / ``discard()``), so this worker sees them at once;
+* every ``RECIPE_INDEX_REFRESH_SECONDS`` (or after ``poke()``) the thread
+  re-reads the rows whose ``updated_at`` moved past its watermark, which
+  picks up other workers, bulk imports and raw SQL. Only rows read from
+  the database move the watermark, and never past the start of a
+  transaction still open (Postgres), which may yet commit rows stamped
+  before it; ``RECIPE_INDEX_OVERLAP_SECONDS`` more covers clock skew
+  between app servers and, on SQLite, long write transactions;
+* every ``RECIPE_INDEX_REBUILD_SECONDS`` it rebuilds from scratch, which
+  refits the model (IDF, feature scaling) and drops rows another worker
+  deleted. Until then such rows can still come up as hits, so callers
+  re-check hits against the database.
+
+Rows are append-only with tombstones: an update appends a new row and
+blanks the old one, so queries read a ``State`` snapshot without taking the
+writer lock. Once tombstones are a quarter of the rows the thread compacts
+them away, copying the matrix outside the lock.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta, timezone
+from typing import NamedTuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+CHUNK = 5_000
+# rows read to fit the model before a bulk build
+SAMPLE_ROWS = 50_000
+RETRY_AFTER_SECONDS = 5
+# Oldest transaction start among the other sessions. Sessions of other
+# roles show no xact_start without pg_read_all_stats, so imports should
+# run as the app's role.
+_OPEN_TRANSACTIONS = text(
+    "SELECT min(xact_start) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()"
+)
+
+
+class State(NamedTuple):
+    model: object
+    matrix: np.ndarray  # capacity x dims; rows past ``size`` are unused
+    ids: np.ndarray  # recipe id per row, -1 for tombstones
+    size: int
+
+
+class RecipeIndex:
+    """One matrix row per public recipe; subclasses define the row encoding."""
+
+    name = "recipes"
+    dims = 0
+    columns: tuple = ()  # Recipe attributes that fit() and encode() read
+    order = "C"  # "F" keeps each column contiguous, for column scans
+    blank = 0.0  # what tombstoned rows are overwritten with
+
+    def __init__(self):
+        self._state: State | None = None
+        self._pos: dict[int, int] = {}  # recipe id -> row
+        self._dead = 0
+        self._lock = threading.Lock()
+        self.watermark = None  # only moved by rows read from the database
+        self._recent: dict = {}  # id -> updated_at applied since the catch-up's floor
+        self._generation = 0  # bumped by rebuilds and compactions
+        self.built_at = 0.0
+
+    def fit(self, sample) -> object:
+        """Model for ``encode()`` (scaling, vocabulary, ...) from a sample of rows."""
+        return None
+
+    def encode(self, model, rows) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def snapshot(self) -> State:
+        state = self._state
+        if state is None:
+            start()
+            raise HTTPException(
+                status_code=503,
+                detail=f"The {self.name} index is still being built",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        return state
+
+    def stats(self) -> dict:
+        state = self._state
+        return {
+            "ready": state is not None,
+            "rows": len(self._pos),
+            "tombstones": self._dead,
+            "bytes": state.matrix.nbytes if state else 0,
+            "built_at": self.built_at,
+        }
+
+    # ---------- bulk ----------
+    def _select(self):
+        return select(Recipe.id, Recipe.updated_at, *(getattr(Recipe, c) for c in self.columns)).where(
+            Recipe.is_public.is_(True)
+        )
+
+    def rebuild(self, engine) -> None:
+        started = time.monotonic()
+        with engine.connect() as conn:
+            open_since = _oldest_open(conn)
+            watermark = _held_back(conn.scalar(select(func.max(Recipe.updated_at))), open_since)
+            total = conn.scalar(select(func.count()).select_from(Recipe).where(Recipe.is_public.is_(True)))
+            step = max(1, total // SAMPLE_ROWS)
+            model = self.fit(conn.execute(self._select().where(Recipe.id % step == 0)).all())
+
+            capacity = total + total // 8 + 1024
+            matrix, ids = self._allocate(capacity)
+            size = 0
+            recent = {}  # so the first catch-up skips what the build already read
+            floor = watermark and _utc(_floor(watermark))
+            result = conn.execute(self._select().execution_options(yield_per=CHUNK))
+            for rows in result.partitions():
+                if size + len(rows) > capacity:  # inserted since the count
+                    capacity = 2 * (size + len(rows))
+                    matrix, ids = self._resized(matrix, ids, capacity)
+                matrix[size:size + len(rows)] = self.encode(model, rows)
+                ids[size:size + len(rows)] = [row.id for row in rows]
+                size += len(rows)
+                recent.update(
+                    (row.id, _utc(row.updated_at)) for row in rows if floor is None or _utc(row.updated_at) >= floor
+                )
+
+        with self._lock:
+            self._state = State(model, matrix, ids, size)
+            self._pos = {int(recipe_id): row for row, recipe_id in enumerate(ids[:size])}
+            self._dead = 0
+            self._generation += 1
+            # Writes recorded into the old state while this one was loading
+            # are re-read by the next catch-up from here.
+            self.watermark = watermark
+            self._recent = recent
+            self.built_at = time.time()
+        logger.info(
+            "%s index built: %d rows in %.1fs (%.0f MiB)",
+            self.name, size, time.monotonic() - started, matrix.nbytes / 2**20,
+        )
+
+    def catch_up(self, engine) -> int:
+        """Apply rows changed since the watermark; returns how many were new."""
+        stmt = select(Recipe.id, Recipe.is_public, Recipe.updated_at, *(getattr(Recipe, c) for c in self.columns))
+        floor = _floor(self.watermark)
+        if floor is not None:
+            stmt = stmt.where(Recipe.updated_at >= floor)
+        with engine.connect() as conn:
+            # read first: transactions starting after it stamp rows later
+            open_since = _oldest_open(conn)
+            rows = conn.execute(stmt).all()
+        applied = self.apply(rows)
+        stamps = [row.updated_at for row in rows if row.updated_at is not None]
+        if stamps:
+            self._advance(_held_back(max(stamps, key=_utc), open_since))
+        return applied
+
+    # ---------- incremental ----------
+    def record(self, recipe) -> None:
+        """Apply one committed recipe (ORM object or row) to the index."""
+        self.apply([recipe])
+
+    def discard(self, recipe_id: int) -> None:
+        with self._lock:
+            row = self._pos.pop(recipe_id, None)
+            if row is not None:
+                self._bury(self._state.matrix, self._state.ids, row)
+                self._maybe_compact()
+
+    def apply(self, rows) -> int:
+        """Upsert the public ``rows`` and drop the private ones.
+
+        A row is skipped when a version at least as new was already applied,
+        so a catch-up that read a row just before a route updated it cannot
+        put the old version back.
+        """
+        if self._state is None:
+            return 0  # the build reads them
+        rows = [row for row in rows if self._is_newer(row)]
+        public = [row for row in rows if row.is_public]
+        encoded = self.encode(self._state.model, public) if public else None
+        with self._lock:
+            state = self._state
+            matrix, ids, size = state.matrix, state.ids, state.size
+            if size + len(public) > len(ids):
+                matrix, ids = self._resized(matrix, ids, 2 * (size + len(public)))
+            applied = 0
+            vectors = iter(encoded) if public else None
+            for row in rows:
+                vector = next(vectors) if row.is_public else None
+                if not self._is_newer(row):
+                    continue  # raced with another apply
+                old = self._pos.pop(row.id, None)
+                if old is not None:
+                    self._bury(matrix, ids, old)
+                if row.is_public:
+                    matrix[size] = vector
+                    ids[size] = row.id
+                    self._pos[row.id] = size
+                    size += 1
+                self._recent[row.id] = row.updated_at and _utc(row.updated_at)
+                applied += 1
+            # rows are written before readers can see the new size
+            self._state = State(state.model, matrix, ids, size)
+            self._maybe_compact()
+        return applied
+
+    def _is_newer(self, row) -> bool:
+        seen = self._recent.get(row.id)
+        return seen is None or row.updated_at is None or _utc(row.updated_at) > seen
+
+    def _advance(self, watermark) -> None:
+        with self._lock:
+            if self.watermark is not None and _utc(watermark) <= _utc(self.watermark):
+                return
+            self.watermark = watermark
+            floor = _utc(_floor(watermark))
+            self._recent = {key: stamp for key, stamp in self._recent.items() if stamp is None or stamp >= floor}
+
+    def _allocate(self, capacity: int):
+        matrix = np.full((capacity, self.dims), self.blank, np.float32, order=self.order)
+        return matrix, np.full(capacity, -1, np.int64)
+
+    def _resized(self, matrix: np.ndarray, ids: np.ndarray, capacity: int):
+        grown, grown_ids = self._allocate(capacity)
+        grown[:len(matrix)] = matrix
+        grown_ids[:len(ids)] = ids
+        return grown, grown_ids
+
+    def _bury(self, matrix: np.ndarray, ids: np.ndarray, row: int) -> None:
+        ids[row] = -1
+        matrix[row] = self.blank
+        self._dead += 1
+
+    def _needs_compact(self) -> bool:
+        state = self._state
+        return state is not None and self._dead >= max(1024, state.size // 4)
+
+    def _maybe_compact(self) -> None:
+        # writers run on request threads and the event loop: leave the copy to the thread
+        if self._needs_compact():
+            poke()
+
+    def compact(self) -> None:
+        """Drop the tombstoned rows, if there are enough of them.
+
+        The bulk copy works on a snapshot outside the writer lock; writes
+        applied meanwhile (rows appended past its size, rows buried since)
+        are replayed under the lock before the swap.
+        """
+        if not self._needs_compact():
+            return
+        state, generation = self._state, self._generation
+        live = np.flatnonzero(state.ids[:state.size] >= 0)
+        copied = state.ids[live]
+        capacity = len(live) + len(live) // 8 + 1024
+        matrix, ids = self._allocate(capacity)
+        matrix[:len(live)] = state.matrix[live]
+        ids[:len(live)] = copied
+        pos = {int(recipe_id): row for row, recipe_id in enumerate(copied)}
+
+        with self._lock:
+            if self._generation != generation:
+                return  # rebuilt meanwhile
+            current = self._state
+            # the arrays may have been resized since, but rows keep their positions
+            ids[:len(live)] = current.ids[live]
+            buried = np.flatnonzero(ids[:len(live)] < 0)
+            matrix[buried] = self.blank
+            for row in buried:
+                pos.pop(int(copied[row]), None)
+            size = len(live)
+            added = current.size - state.size
+            if size + added > capacity:
+                matrix, ids = self._resized(matrix, ids, 2 * (size + added))
+            matrix[size:size + added] = current.matrix[state.size:current.size]
+            ids[size:size + added] = current.ids[state.size:current.size]
+            for row in range(size, size + added):
+                if ids[row] >= 0:
+                    pos[int(ids[row])] = row
+            size += added
+            self._state = State(current.model, matrix, ids, size)
+            self._pos = pos
+            self._dead = len(buried) + int((ids[len(live):size] < 0).sum())
+            self._generation += 1
+
+
+def column_stats(rows, names) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and standard deviation of each named attribute, skipping NULLs."""
+    values = np.array([[getattr(r, n) for n in names] for r in rows], np.float64).reshape(-1, len(names))
+    present = ~np.isnan(values)
+    count = np.maximum(present.sum(axis=0), 1)
+    mean = np.where(present, values, 0).sum(axis=0) / count
+    return mean, np.sqrt((np.where(present, values - mean, 0) ** 2).sum(axis=0) / count)
+
+
+def _oldest_open(conn):
+    """Start of the oldest transaction open in another session (Postgres only;
+    elsewhere the overlap has to cover long transactions)."""
+    if conn.dialect.name != "postgresql":
+        return None
+    return conn.scalar(_OPEN_TRANSACTIONS)
+
+
+def _held_back(newest, open_since):
+    # an open transaction may yet commit rows stamped with its start time
+    if newest is None or open_since is None:
+        return newest
+    return min(newest, open_since, key=_utc)
+
+
+def _floor(watermark):
+    if watermark is None:
+        return None
+    return watermark - timedelta(seconds=settings.RECIPE_INDEX_OVERLAP_SECONDS)
+
+
+def _utc(stamp):
+    # Postgres returns aware datetimes, SQLite naive UTC ones (or aware,
+    # when a raw write stored an offset); compare them all as naive UTC.
+    return stamp.astimezone(timezone.utc).replace(tzinfo=None) if stamp.tzinfo else stamp
+
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int, exclude: int | None = None) -> list[tuple[int, float]]:
+    """The ``k`` best-scoring live rows as (recipe id, score), best first."""
+    scores[ids < 0] = -np.inf
+    if exclude is not None:
+        scores[ids == exclude] = -np.inf
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    best = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    # ids are re-read: a row buried since the mask went on comes back as -1
+    return [(int(ids[i]), float(scores[i])) for i in best if scores[i] > -np.inf and ids[i] >= 0]
+
+
+# ---------- registry and refresh thread ----------
+indexes: list[RecipeIndex] = []
+_wake = threading.Event()
+_thread: threading.Thread | None = None
+_thread_lock = threading.Lock()
+
+
+def register(index: RecipeIndex) -> RecipeIndex:
+    indexes.append(index)
+    metrics.CallbackGauge(
+        f"recipe_index_{index.name}_rows",
+        f"Public recipes in the in-memory {index.name} index.",
+        lambda: len(index._pos) if index.ready else None,
+    )
+    return index
+
+
+def record(recipe) -> None:
+    for index in indexes:
+        index.record(recipe)
+
+
+def discard(recipe_id: int) -> None:
+    for index in indexes:
+        index.discard(recipe_id)
+
+
+def poke() -> None:
+    """Catch up now instead of at the next refresh tick (e.g. after a bulk import)."""
+    _wake.set()
+
+
+def start() -> None:
+    """Start building and refreshing the registered indexes (idempotent)."""
+    global _thread
+    if not indexes:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="recipe-index", daemon=True)
+            _thread.start()
+
+
+def _run() -> None:
+    from app.db.database import engine
+
+    while True:
+        for index in indexes:
+            try:
+                if not index.ready or time.time() - index.built_at > settings.RECIPE_INDEX_REBUILD_SECONDS:
+                    index.rebuild(engine)
+                index.catch_up(engine)
+                index.compact()
+            except Exception:
+                logger.exception("Refreshing the %s index failed", index.name)
+        _wake.wait(settings.RECIPE_INDEX_REFRESH_SECONDS)
+        _wake.clear()
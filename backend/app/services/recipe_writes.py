@@ -0,0 +1,73 @@
+"""Single-recipe writes as one statement each.
+
+Every write is an ``INSERT``/``UPDATE``/``DELETE ... RETURNING``; updates
+and deletes are scoped with ``WHERE id = :id AND created_by = :user``, so
+a missing recipe and someone else's both come back as no row (a 404)
+without a SELECT first. The returned rows are plain column rows rather
+than ORM objects, so nothing is expired on commit and reloaded when the
+response is serialized.
+"""
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+
+from app.models.models import Recipe
+
+# what RecipeOut and the in-memory recipe indexes read
+COLUMNS = tuple(Recipe.__table__.columns)
+
+
+def _owned(stmt, user_id: int, recipe_id: int):
+    return stmt.where(Recipe.id == recipe_id, Recipe.created_by == user_id)
+
+
+def insert_statement(user_id: int, values: dict):
+    return insert(Recipe).values(created_by=user_id, **values).returning(*COLUMNS)
+
+
+def update_statement(user_id: int, recipe_id: int, values: dict):
+    if not values:
+        # nothing to write (and no updated_at bump): just the recipe
+        return _owned(select(*COLUMNS), user_id, recipe_id)
+    # updated_at comes from the column's onupdate
+    return (
+        _owned(update(Recipe), user_id, recipe_id)
+        .values(**values)
+        .returning(*COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_statement(user_id: int, recipe_id: int):
+    return (
+        _owned(delete(Recipe), user_id, recipe_id)
+        .returning(Recipe.is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def photo_statement(user_id: int, recipe_id: int, photo_url: str):
+    # the derivatives job sets photo_derived once the variants are written
+    return (
+        _owned(update(Recipe), user_id, recipe_id)
+        .values(photo_url=photo_url, photo_derived=False)
+        .returning(Recipe.is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def derived_statement(photo_urls: list[str]):
+    """Flag the recipes showing any of ``photo_urls`` as having their variants;
+    bumps their updated_at, so validators and caches see the new URLs."""
+    return (
+        update(Recipe)
+        .where(Recipe.photo_url.in_(photo_urls), Recipe.photo_derived.is_(False))
+        .values(photo_derived=True)
+        .returning(Recipe.is_public)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def found(row):
+    if row is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return row
@@ -0,0 +1,137 @@
+""""More like this" for ``/feed/{recipe_id}/similar``.
+
+Each public recipe is one unit-length float32 vector made of four blocks,
+each normalized on its own and scaled by the square root of its weight,
+so a dot product is the weighted sum of the per-block cosines:
+
+* text: TF-IDF over title (counted twice), description and instructions,
+  hashed into ``SIMILAR_TEXT_DIMS`` signed buckets (IDF from a sample of
+  the corpus, refit on every rebuild; unseen terms get the highest IDF);
+* cuisine: one-hot, hashed into ``CUISINE_DIMS`` buckets;
+* difficulty: one-hot over easy/medium/hard;
+* macros: calories, protein, carbs and fat as z-scores, missing ones 0.
+
+A query is one matrix-vector product over the whole index plus an
+``argpartition``; the matrix takes rows x dims x 4 bytes per worker.
+"""
+import math
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.models import Recipe
+from app.services import recipe_index
+
+CUISINE_DIMS = 32
+DIFFICULTIES = ("easy", "medium", "hard")
+MACROS = ("calories", "protein_g", "carbs_g", "fat_g")
+# share of the score per block; they add up to 1
+WEIGHTS = {"text": 0.6, "cuisine": 0.15, "difficulty": 0.05, "macros": 0.2}
+# extra hits fetched for the ones the database no longer has public
+SLACK = 10
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from in into is it its of on or so the then to until "
+    "with you your".split()
+)
+
+
+def tokens(recipe) -> list[str]:
+    text = " ".join(filter(None, (recipe.title, recipe.title, recipe.description, recipe.instructions)))
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class SimilarIndex(recipe_index.RecipeIndex):
+    name = "similar"
+    columns = ("title", "description", "instructions", "cuisine", "difficulty", *MACROS)
+
+    def __init__(self, text_dims: int):
+        super().__init__()
+        self.text_dims = text_dims
+        self.dims = text_dims + CUISINE_DIMS + len(DIFFICULTIES) + len(MACROS)
+        self._slots: dict[str, int] = {}  # term -> signed bucket + 1
+
+    def _slot(self, term: str) -> int:
+        slot = self._slots.get(term)
+        if slot is None:
+            h = zlib.crc32(term.encode())
+            slot = (h % self.text_dims + 1) * (1 if h & 0x80000000 else -1)
+            self._slots[term] = slot
+        return slot
+
+    def fit(self, sample) -> dict:
+        df = Counter()
+        for recipe in sample:
+            df.update(set(tokens(recipe)))
+        n = len(sample)
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        mean, std = recipe_index.column_stats(sample, MACROS)
+        return {"idf": idf, "default_idf": math.log(1 + n) + 1, "mean": mean, "std": std}
+
+    def encode(self, model, rows) -> np.ndarray:
+        n, d = len(rows), self.text_dims
+        idf, default_idf = model["idf"], model["default_idf"]
+        slot = self._slot
+
+        # text: scatter (row, bucket, weight) triples, summed with bincount
+        cells, weights = [], []
+        for i, recipe in enumerate(rows):
+            base = i * d - 1
+            for term, tf in Counter(tokens(recipe)).items():
+                s = slot(term)
+                w = (1.0 + math.log(tf)) * idf.get(term, default_idf)
+                if s > 0:
+                    cells.append(base + s)
+                    weights.append(w)
+                else:
+                    cells.append(base - s)
+                    weights.append(-w)
+        text = np.bincount(np.array(cells, np.int64), weights, minlength=n * d).reshape(n, d)
+
+        cuisine = np.zeros((n, CUISINE_DIMS))
+        difficulty = np.zeros((n, len(DIFFICULTIES)))
+        macros = np.full((n, len(MACROS)), np.nan)
+        for i, recipe in enumerate(rows):
+            if recipe.cuisine:
+                cuisine[i, zlib.crc32(recipe.cuisine.strip().lower().encode()) % CUISINE_DIMS] = 1
+            if recipe.difficulty and recipe.difficulty.lower() in DIFFICULTIES:
+                difficulty[i, DIFFICULTIES.index(recipe.difficulty.lower())] = 1
+            macros[i] = [getattr(recipe, m) if getattr(recipe, m) is not None else np.nan for m in MACROS]
+        std = np.where(model["std"] > 0, model["std"], 1.0)
+        macros = np.nan_to_num((macros - model["mean"]) / std)
+
+        blocks = [(text, "text"), (cuisine, "cuisine"), (difficulty, "difficulty"), (macros, "macros")]
+        out = np.empty((n, self.dims), np.float32)
+        col = 0
+        for block, name in blocks:
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            out[:, col:col + block.shape[1]] = block / np.where(norms > 0, norms, 1) * math.sqrt(WEIGHTS[name])
+            col += block.shape[1]
+        return out
+
+    def similar_to(self, recipe, k: int) -> list[tuple[int, float]]:
+        """Up to ``k`` (recipe id, score) pairs most like ``recipe``, best first.
+
+        The query vector is encoded from ``recipe`` itself, so it can be a
+        recipe the index has not caught up with yet.
+        """
+        state = self.snapshot()
+        query = self.encode(state.model, [recipe])[0]
+        ids = state.ids[:state.size]
+        return recipe_index.top_k(state.matrix[:state.size] @ query, ids, k, exclude=recipe.id)
+
+
+def source_statement(recipe_id: int):
+    """The public recipe to match, with just the columns ``encode()`` reads."""
+    columns = (getattr(Recipe, c) for c in SimilarIndex.columns)
+    return select(Recipe.id, *columns).where(Recipe.id == recipe_id, Recipe.is_public.is_(True))
+
+
+index = SimilarIndex(settings.SIMILAR_TEXT_DIMS)
+if settings.SIMILAR_ENABLED:
+    recipe_index.register(index)
@@ -0,0 +1,86 @@
+"""Content-addressed photo storage under ``uploads/``.
+
+Uploads are streamed in fixed-size chunks to a temp file while being
+hashed, then atomically renamed to ``uploads/<sha[:2]>/<sha>.<ext>``. The
+same image uploaded twice maps to the same path, so it is stored once.
+A file stored for a photo that was then refused is removed again with
+``discard_upload``, unless it was already there or has been reused since.
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.photos import UPLOAD_DIR
+
+TMP_DIR = os.path.join(UPLOAD_DIR, ".tmp")
+CHUNK_SIZE = 64 * 1024
+
+
+def _extension(file: UploadFile) -> str:
+    ext = mimetypes.guess_extension(file.content_type or "") or ""
+    if ext in ("", ".jpe"):
+        ext = ".jpg" if file.content_type == "image/jpeg" else ""
+    if not ext and file.filename and "." in file.filename:
+        ext = "." + file.filename.rsplit(".", 1)[-1]
+    ext = ext.lower()
+    return ext if ext[1:].isalnum() and len(ext) <= 6 else ".bin"
+
+
+def content_path(digest: str, ext: str) -> str:
+    return os.path.join(UPLOAD_DIR, digest[:2], f"{digest}{ext}")
+
+
+def store_upload(file: UploadFile, max_bytes: int) -> tuple[str, int | None]:
+    """Stream an image upload into content-addressed storage.
+
+    Returns its path and, if this call created the file, its mtime (for
+    ``discard_upload``); None when an identical photo was already stored.
+    """
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    os.makedirs(TMP_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=TMP_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := file.file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="File is empty")
+
+        path = content_path(digest.hexdigest(), _extension(file))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(tmp_path)  # identical photo already stored
+            os.utime(path)  # in use again: restarts the orphan sweep's grace period
+            return path, None
+        os.replace(tmp_path, path)
+        return path, os.stat(path).st_mtime_ns
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def discard_upload(path: str, created: int | None) -> None:
+    """Undo a ``store_upload`` whose photo was not saved.
+
+    Only a file that call created goes, and only while its mtime is
+    untouched: a newer upload of the same image refreshes it to keep it.
+    """
+    if created is None:
+        return
+    try:
+        if os.stat(path).st_mtime_ns == created:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,40 @@
+"""``GET /users/me/stats`` from the user's ``user_recipe_stats`` cells (app/db/user_stats.py)."""
+from sqlalchemy import select
+
+from app.db.user_stats import MACROS
+from app.models.models import UserRecipeStat
+from app.services.facets import value_counts
+
+RATINGS = range(1, 6)
+
+
+def stats_statement(user_id: int):
+    # a primary key range: one user's cells
+    return select(UserRecipeStat).where(UserRecipeStat.user_id == user_id, UserRecipeStat.recipe_count > 0)
+
+
+def summarize(cells) -> dict:
+    total = public = 0
+    cuisine, difficulty, rating = {}, {}, {}
+    sums, counts = dict.fromkeys(MACROS, 0), dict.fromkeys(MACROS, 0)
+    for cell in cells:
+        total += cell.recipe_count
+        public += cell.public_count
+        for dim, key in ((cuisine, cell.cuisine), (difficulty, cell.difficulty), (rating, cell.rating)):
+            dim[key] = dim.get(key, 0) + cell.recipe_count
+        for macro in MACROS:
+            sums[macro] += getattr(cell, f"{macro}_sum")
+            counts[macro] += getattr(cell, f"{macro}_count")
+
+    rated = total - rating.get(-1, 0)
+    rating_sum = sum(value * count for value, count in rating.items() if value != -1)
+    return {
+        "total_recipes": total,
+        "public_recipes": public,
+        "rated_recipes": rated,
+        "average_rating": rating_sum / rated if rated else None,
+        "rating_histogram": [{"value": r, "count": rating.get(r, 0)} for r in RATINGS],
+        "cuisine": value_counts(cuisine, ""),
+        "difficulty": value_counts(difficulty, ""),
+        "average_macros": {m: sums[m] / counts[m] if counts[m] else None for m in MACROS},
+    }
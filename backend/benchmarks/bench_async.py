@@ -0,0 +1,102 @@
+"""Requests/sec of the sync vs async (DB_ASYNC) route stacks at high concurrency.
+
+Each mode runs in its own interpreter (the stack is chosen at import time)
+against a freshly seeded database, driven in-process through ASGI so only
+the app and the database are measured. Run from ``backend/``:
+
+    python -m benchmarks.bench_async --requests 5000 --concurrency 200
+
+Pass ``--database-url`` to point both modes at a Postgres instance; round
+trips over a real network are where the async stack pays off.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import percentile, run_worker, seed_recipes
+
+
+def worker(args) -> None:
+    os.environ["DB_ASYNC"] = "true" if args.mode == "async" else "false"
+    os.environ["FEED_CACHE_ENABLED"] = "false"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # Same pool for both modes, one connection per concurrent request
+    os.environ["DB_POOL_SIZE"] = str(args.concurrency)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from app.core.security import create_access_token
+    from app.db.database import engine
+    from app.main import app
+    from benchmarks.asgi import request
+
+    seed_recipes(engine, args.rows)
+
+    auth = {"authorization": f"Bearer {create_access_token('1')}"}
+    urls = [
+        ("/feed?limit=20", {}),
+        ("/feed?limit=20&max_cook_time=30", {}),
+        ("/recipes?limit=20", auth),
+        ("/recipes/1", auth),
+    ]
+
+    async def drive() -> dict:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one(i: int):
+            url, headers = urls[i % len(urls)]
+            async with semaphore:
+                start = time.perf_counter()
+                status, _, _ = await request(app, "GET", url, headers)
+                latencies.append(time.perf_counter() - start)
+                assert status == 200, status
+
+        await asyncio.gather(*(one(i) for i in range(args.concurrency)))  # warm up
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "mode": args.mode,
+            "rps": args.requests / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+    print(json.dumps(asyncio.run(drive())))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--database-url")
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        worker(args)
+        return
+
+    db_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {db_url.split('://')[0]}")
+    for mode in ("sync", "async"):
+        result = run_worker(
+            "benchmarks.bench_async",
+            ["--mode", mode, "--requests", args.requests, "--concurrency", args.concurrency, "--rows", args.rows],
+            {"DATABASE_URL": db_url},
+        )
+        print(
+            f"  {mode:<6} {result['rps']:9.1f} req/s"
+            f"   p50 {result['p50_ms']:7.1f} ms   p99 {result['p99_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""CPU cost vs bytes saved for each response codec on a 50-item feed page.
+
+Encodes a full-row page (every ``RecipeOut`` field) and a ``RecipeSummary``
+page with each available codec and level. It reports the ratio, the
+compression time, and the transfer time saved on a slow mobile link. The
+middleware defaults should sit where the compression time stays well
+below the transfer time it saves. Run from ``backend/``:
+
+    python -m benchmarks.bench_compression --mbps 10
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.middleware.compression import CompressionMiddleware, available_encodings  # noqa: E402
+from app.schemas.recipe import RecipeOut  # noqa: E402
+from app.services.projection import parse_fields, render_page  # noqa: E402
+from benchmarks.bench_serialization import LIMIT, rows  # noqa: E402
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 9), "zstd": (1, 3, 9)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mbps", type=float, default=10.0, help="client link speed")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    items = rows()
+    meta = {"limit": LIMIT, "offset": 0, "total": 10_000, "next_cursor": None}
+    full = ",".join([*RecipeOut.model_fields, *RecipeOut.model_computed_fields])
+    pages = {
+        "full rows": render_page(meta, items, parse_fields(full)),
+        "summary": render_page(meta, items, None),
+    }
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+
+    print(f"{LIMIT}-item feed page, {args.mbps:g} Mbit/s link, mean of {args.repeat} runs")
+    print(f"  {'page':<10} {'codec':<8} {'bytes':>8} {'ratio':>6} {'cpu':>9} {'saved on wire':>14}")
+    for page, body in pages.items():
+        print(f"  {page:<10} {'identity':<8} {len(body):8d}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                middleware = CompressionMiddleware(
+                    None, gzip_level=level, brotli_quality=level, zstd_level=level
+                )
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    compressed = middleware._compressor(encoding).finish(body)
+                cpu_ms = (time.perf_counter() - start) / args.repeat * 1000
+                saved_ms = (len(body) - len(compressed)) / bytes_per_ms
+                print(
+                    f"  {page:<10} {f'{encoding}-{level}':<8} {len(compressed):8d}"
+                    f" {len(body) / len(compressed):6.1f} {cpu_ms:6.2f} ms {saved_ms:11.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Login throughput vs feed latency while Argon2 runs on the hashing executor.
+
+For each HASH_WORKERS value, a fresh interpreter drives steady /feed traffic
+in-process, first alone and then alongside a burst of concurrent logins, and
+reports logins/sec, shed logins (503) and the feed's p99. Run from
+``backend/``:
+
+    python -m benchmarks.bench_hashing --workers 1,2,4,16 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import percentile, run_worker, seed_recipes
+
+PASSWORD = "benchpass1"
+
+
+def worker(args) -> None:
+    os.environ["FEED_CACHE_ENABLED"] = "false"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["DB_POOL_SIZE"] = "100"
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from app.core.security import hash_password
+    from app.db.database import engine
+    from app.main import app
+    from benchmarks.asgi import request
+
+    seed_recipes(engine, 2000, password_hash=hash_password(PASSWORD))
+    login_body = json.dumps({"email": "bench@example.com", "password": PASSWORD}).encode()
+
+    async def run(with_logins: bool) -> dict:
+        deadline = time.perf_counter() + args.seconds
+        feed_latencies = []
+        logins = {"ok": 0, "shed": 0}
+
+        async def feed_client():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _, _ = await request(app, "GET", "/feed?limit=20")
+                feed_latencies.append(time.perf_counter() - start)
+                assert status == 200, status
+
+        async def login_client():
+            while time.perf_counter() < deadline:
+                status, _, _ = await request(
+                    app, "POST", "/auth/login", {"content-type": "application/json"}, login_body
+                )
+                if status == 503:
+                    logins["shed"] += 1
+                    await asyncio.sleep(0.01)
+                else:
+                    assert status == 200, status
+                    logins["ok"] += 1
+
+        clients = [feed_client() for _ in range(args.feed_concurrency)]
+        if with_logins:
+            clients += [login_client() for _ in range(args.login_concurrency)]
+        await asyncio.gather(*clients)
+
+        feed_latencies.sort()
+        return {
+            "feed_p99_ms": percentile(feed_latencies, 99) * 1000,
+            "feed_rps": len(feed_latencies) / args.seconds,
+            "logins_per_s": logins["ok"] / args.seconds,
+            "logins_shed": logins["shed"],
+        }
+
+    baseline = asyncio.run(run(with_logins=False))
+    loaded = asyncio.run(run(with_logins=True))
+    print(json.dumps({"baseline": baseline, "loaded": loaded}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4,16", help="HASH_WORKERS values to compare")
+    parser.add_argument("--queue-depth", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--feed-concurrency", type=int, default=20)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    print(
+        f"feed x{args.feed_concurrency}, logins x{args.login_concurrency},"
+        f" queue depth {args.queue_depth}, {args.seconds:g}s per run"
+    )
+    print(f"  {'workers':>7} {'logins/s':>9} {'shed':>6} {'feed p99 idle':>14} {'feed p99 burst':>15}")
+    for workers in args.workers.split(","):
+        db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_hashing.db')}"
+        result = run_worker(
+            "benchmarks.bench_hashing",
+            ["--worker", "--seconds", args.seconds,
+             "--feed-concurrency", args.feed_concurrency, "--login-concurrency", args.login_concurrency],
+            {"DATABASE_URL": db_url, "HASH_WORKERS": workers, "HASH_QUEUE_DEPTH": str(args.queue_depth)},
+        )
+        base, loaded = result["baseline"], result["loaded"]
+        print(
+            f"  {workers:>7} {loaded['logins_per_s']:9.1f} {loaded['logins_shed']:6d}"
+            f" {base['feed_p99_ms']:11.1f} ms {loaded['feed_p99_ms']:12.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
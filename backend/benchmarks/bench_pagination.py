@@ -0,0 +1,108 @@
+"""Offset vs cursor pagination on the public feed.
+
+Seeds a throwaway SQLite database and times ``public_feed`` for page 1 and a
+deep page in both modes. Run from ``backend/``:
+
+    python -m benchmarks.bench_pagination --rows 250000 --page 10000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_pagination.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["FEED_CACHE_ENABLED"] = "false"
+
+from sqlalchemy import insert, select  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from app.core.pagination import encode_cursor, paginate  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.models.models import Recipe, User  # noqa: E402
+from app.routes.feed import public_feed  # noqa: E402
+
+LIMIT = 20
+
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "username": "bench", "email": "bench@example.com", "password_hash": "x"}])
+        batch = []
+        for i in range(1, rows + 1):
+            batch.append({"id": i, "created_by": 1, "title": f"Recipe {i}", "is_public": i % 10 != 0})
+            if len(batch) == 10_000:
+                conn.execute(insert(Recipe), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(Recipe), batch)
+
+
+def cursor_for_page(db, page: int) -> str | None:
+    if page == 1:
+        return None
+    boundary = (
+        db.query(Recipe.id)
+        .filter(Recipe.is_public.is_(True))
+        .order_by(Recipe.id.desc())
+        .offset((page - 1) * LIMIT - 1)
+        .limit(1)
+        .scalar()
+    )
+    return encode_cursor({"id": boundary})
+
+
+def time_call(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    db = SessionLocal()
+    try:
+        deep_cursor = cursor_for_page(db, args.page)
+        cases = {
+            "offset page 1": dict(offset=0),
+            f"offset page {args.page}": dict(offset=(args.page - 1) * LIMIT),
+            "cursor page 1": dict(cursor=None),
+            f"cursor page {args.page}": dict(cursor=deep_cursor),
+        }
+        public = select(Recipe).where(Recipe.is_public.is_(True))
+        print(f"{args.rows} recipes, limit={LIMIT}, median of {args.repeat} runs")
+        print(f"  {'case':<22} {'route':>11} {'page query':>11}")
+        for name, params in cases.items():
+            params = {"offset": 0, "cursor": None, **params}
+
+            def route():
+                public_feed(Request({"type": "http", "headers": []}), limit=LIMIT, **params, db=db)
+                db.expunge_all()
+
+            def page_query():
+                paginate(db, public, Recipe.id, LIMIT, params["offset"], params["cursor"])
+                db.expunge_all()
+
+            print(
+                f"  {name:<22} {time_call(route, args.repeat):8.2f} ms"
+                f" {time_call(page_query, args.repeat):8.2f} ms"
+            )
+    finally:
+        db.close()
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
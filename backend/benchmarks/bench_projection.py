@@ -0,0 +1,94 @@
+"""Payload size and latency of a 50-item feed page: full rows vs RecipeSummary.
+
+Seeds a throwaway SQLite database with recipes carrying realistic long
+``description``/``instructions``/``review`` text and requests ``/feed``
+in-process, once asking for every ``RecipeOut`` field (what the list
+endpoints used to return) and once with the default summary. Run from
+``backend/``:
+
+    python -m benchmarks.bench_projection --rows 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_projection.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["FEED_CACHE_ENABLED"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import Recipe, User  # noqa: E402
+from app.schemas.recipe import RecipeOut  # noqa: E402
+from benchmarks.asgi import request  # noqa: E402
+
+LIMIT = 50
+PARAGRAPH = "Whisk the eggs with a pinch of salt, fold in the flour and rest the batter. "
+
+
+def seed(rows: int) -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "username": "bench", "email": "bench@example.com", "password_hash": "x"}])
+        conn.execute(
+            insert(Recipe),
+            [
+                {
+                    "id": i,
+                    "created_by": 1,
+                    "title": f"Recipe {i}",
+                    "is_public": True,
+                    "cook_time": i % 120,
+                    "calories": 300 + i % 400,
+                    "rating": 1 + i % 5,
+                    "description": PARAGRAPH * 4,
+                    "instructions": PARAGRAPH * 40,
+                    "review": PARAGRAPH * 8,
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+
+
+async def measure(url: str, repeat: int) -> tuple[int, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, _, body = await request(app, "GET", url)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert status == 200, status
+    return len(body), statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    full = ",".join([*RecipeOut.model_fields, *RecipeOut.model_computed_fields])
+    cases = {
+        "full RecipeOut": f"/feed?limit={LIMIT}&fields={full}",
+        "RecipeSummary": f"/feed?limit={LIMIT}",
+        "fields=title,rating": f"/feed?limit={LIMIT}&fields=title,rating",
+    }
+    try:
+        print(f"{args.rows} recipes, limit={LIMIT}, median of {args.repeat} runs")
+        print(f"  {'case':<22} {'bytes':>9} {'latency':>11}")
+        for name, url in cases.items():
+            size, latency = asyncio.run(measure(url, args.repeat))
+            print(f"  {name:<22} {size:9d} {latency:8.2f} ms")
+    finally:
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Serialization cost of one 50-item list page, without the database.
+
+Compares the old path (validate each row into ``RecipeOut``/``RecipeSummary``,
+dump to dicts, then let FastAPI validate and encode the ``dict``), a typed
+``Page[RecipeSummary]`` validated from the ORM rows once, and
+``render_page``, which encodes the rows straight to JSON bytes. Run from
+``backend/``:
+
+    python -m benchmarks.bench_serialization --repeat 2000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.models import Recipe  # noqa: E402
+from app.schemas.common import Page  # noqa: E402
+from app.schemas.recipe import RecipeOut, RecipeSummary  # noqa: E402
+from app.services.projection import render_page  # noqa: E402
+
+LIMIT = 50
+TEXT = "Whisk the eggs with a pinch of salt, fold in the flour and rest the batter. "
+
+
+def rows() -> list[Recipe]:
+    items = []
+    for i in range(LIMIT):
+        recipe = Recipe(
+            id=i, title=f"Recipe {i}", author="Bench", cook_time=i, cuisine="thai", difficulty="easy",
+            is_public=True, calories=400, protein_g=30, carbs_g=40, fat_g=12, rating=4,
+            description=TEXT * 4, instructions=TEXT * 40, review=TEXT * 8,
+            photo_url=f"uploads/ab/ab{i:062d}.jpg", photo_derived=True,
+        )
+        recipe.review_excerpt = recipe.review[:160]
+        items.append(recipe)
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = rows()
+    meta = {"limit": LIMIT, "offset": 0, "total": 10_000, "next_cursor": None}
+    as_dict = TypeAdapter(dict)
+    typed = TypeAdapter(Page[RecipeSummary])
+
+    def response_model_dict(schema):
+        def run():
+            content = {"meta": meta, "items": [schema.model_validate(r).model_dump() for r in items]}
+            return as_dict.dump_json(as_dict.validate_python(content))
+        return run
+
+    cases = {
+        "dict of RecipeOut": response_model_dict(RecipeOut),
+        "dict of RecipeSummary": response_model_dict(RecipeSummary),
+        "Page[RecipeSummary]": lambda: typed.dump_json(typed.validate_python({"meta": meta, "items": items})),
+        "render_page": lambda: render_page(meta, items, None),
+    }
+    print(f"{LIMIT}-item page, mean of {args.repeat} runs")
+    print(f"  {'path':<24} {'per page':>11} {'bytes':>8}")
+    for name, run in cases.items():
+        size = len(run())
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            run()
+        per_page = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"  {name:<24} {per_page:8.0f} us {size:8d}")
+
+
+if __name__ == "__main__":
+    main()
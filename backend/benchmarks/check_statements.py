@@ -0,0 +1,115 @@
+"""Check how many SQL statements each recipe write route runs.
+
+Every write is meant to be one ownership-scoped statement with RETURNING
+(app/services/recipe_writes.py), 404s included, plus the INSERT of any
+background job it queues (app/services/jobs.py). This sends each route
+in-process against a throwaway SQLite database with the SQL profiler on,
+reads its ``X-DB-Queries`` header and exits non-zero when a count differs
+from ``EXPECTED``. Tokens are trusted as is (AUTH_TRUST_TOKEN_SUB), so the
+users lookup is not counted. Run from ``backend/``, with ``DB_ASYNC=true``
+for the async routes:
+
+    python -m benchmarks.check_statements
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+
+# The uploaded photo lands in the temp dir's uploads/, not backend/uploads/.
+sys.path.insert(0, os.getcwd())
+os.chdir(tempfile.mkdtemp())
+os.makedirs("uploads")
+os.environ["DATABASE_URL"] = "sqlite:///check_statements.db"
+os.environ["SQL_PROFILE_ENABLED"] = "true"
+os.environ["AUTH_TRUST_TOKEN_SUB"] = "true"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["METRICS_ENABLED"] = "false"
+
+from PIL import Image  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import Recipe, User  # noqa: E402
+from benchmarks.asgi import request  # noqa: E402
+
+# (label, method, url, body, expected status, expected statements)
+EXPECTED = [
+    ("create", "POST", "/recipes", {"title": "Soup", "is_public": True}, 200, 1),
+    ("update", "PUT", "/recipes/1", {"title": "Stew", "cook_time": 40}, 200, 1),
+    ("update, not owner", "PUT", "/recipes/3", {"title": "Stew"}, 404, 1),
+    ("update, missing", "PUT", "/recipes/999", {"title": "Stew"}, 404, 1),
+    # the UPDATE plus its derivatives job, in one transaction
+    ("photo", "POST", "/recipes/1/photo", "photo", 200, 2),
+    ("photo, not owner", "POST", "/recipes/3/photo", "photo", 404, 1),
+    ("batch update", "PATCH", "/recipes/batch", {"ids": [1, 2, 3], "changes": {"rating": 4}}, 200, 1),
+    ("delete", "DELETE", "/recipes/2", None, 200, 1),
+    ("delete, not owner", "DELETE", "/recipes/3", None, 404, 1),
+    ("batch delete", "DELETE", "/recipes/batch", {"ids": [1, 3, 4]}, 200, 1),
+]
+
+BOUNDARY = "check-statements"
+
+
+def seed() -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x"}
+                for i in (1, 2)
+            ],
+        )
+        conn.execute(
+            insert(Recipe),
+            [{"id": i, "created_by": 1 if i < 3 else 2, "title": f"Recipe {i}"} for i in (1, 2, 3)],
+        )
+
+
+def png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def encode(body) -> tuple[dict, bytes]:
+    if body is None:
+        return {}, b""
+    if body == "photo":
+        payload = (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="photo.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode() + png() + f"\r\n--{BOUNDARY}--\r\n".encode()
+        return {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}, payload
+    return {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+async def run() -> bool:
+    auth = {"Authorization": f"Bearer {create_access_token('1')}"}
+    ok = True
+    for label, method, url, body, want_status, want_queries in EXPECTED:
+        headers, payload = encode(body)
+        status, response_headers, _ = await request(app, method, url, {**auth, **headers}, payload)
+        queries = int(dict(response_headers)[b"x-db-queries"])
+        good = status == want_status and queries == want_queries
+        ok &= good
+        print(f"{'ok' if good else 'FAIL':4}  {label:18} {method:6} {url:20} {status}  {queries} statement(s)"
+              + ("" if good else f"  (expected {want_status}, {want_queries})"))
+    return ok
+
+
+def main() -> None:
+    seed()
+    if not asyncio.run(run()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Shared helpers for the benchmark scripts."""
+import json
+import os
+import subprocess
+import sys
+
+
+def percentile(sorted_samples: list, pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * pct / 100))
+    return sorted_samples[index]
+
+
+def seed_recipes(engine, rows: int, password_hash: str = "x") -> None:
+    """Recreate the schema with one user (id 1, bench@example.com) owning ``rows`` public recipes."""
+    from sqlalchemy import insert
+
+    from app.db.base import Base
+    from app.models.models import Recipe, User
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"id": 1, "username": "bench", "email": "bench@example.com", "password_hash": password_hash}],
+        )
+        conn.execute(
+            insert(Recipe),
+            [
+                {"id": i, "created_by": 1, "title": f"Recipe {i}", "is_public": True, "cook_time": i % 120}
+                for i in range(1, rows + 1)
+            ],
+        )
+
+
+def run_worker(module: str, args: list, env: dict) -> dict:
+    """Run ``python -m module *args`` with extra ``env``; it must print one JSON line last."""
+    out = subprocess.run(
+        [sys.executable, "-m", module, *map(str, args)],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        sys.stderr.write(out.stderr)
+        raise SystemExit(f"{module} worker failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
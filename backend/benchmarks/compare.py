@@ -0,0 +1,58 @@
+"""Compare two JSON-lines result files written by ``benchmarks.load --output``.
+
+The last result per (scenario, transport) in each file is compared;
+latency deltas are relative, so negative is better. With
+``--max-regression`` the exit status is 1 when any p95 got worse by more
+than that many percent. Run from ``backend/``:
+
+    python -m benchmarks.compare before.jsonl after.jsonl --max-regression 10
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def latest(path: str) -> dict:
+    results = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                results[result["scenario"], result["transport"]] = result
+    return results
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--max-regression", type=float, help="fail when a p95 grows by more than this %%")
+    args = parser.parse_args()
+
+    before, after = latest(args.before), latest(args.after)
+    regressions = []
+    print(f"  {'scenario':<16}" + "".join(f"{m:>26}" for m in METRICS))
+    for key in sorted(before.keys() & after.keys()):
+        b, a = before[key], after[key]
+        cells = "".join(
+            f"{b[m]:>10.2f} -> {a[m]:>8.2f} {change(b[m], a[m]):+5.0f}%" for m in METRICS
+        )
+        print(f"  {'/'.join(key):<16}{cells}")
+        if args.max_regression is not None and change(b["p95_ms"], a["p95_ms"]) > args.max_regression:
+            regressions.append("/".join(key))
+    for key in sorted(before.keys() ^ after.keys()):
+        print(f"  {'/'.join(key):<16} only in {'before' if key in before else 'after'}")
+
+    if regressions:
+        print(f"p95 regressed more than {args.max_regression}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Small asyncio HTTP/1.1 client for load runs against a live server.
+
+One keep-alive connection per ``request`` caller slot, no TLS, no
+redirects: just enough to drive uvicorn without pulling a client library
+into the requirements, with the same ``(status, headers, body)`` result as
+``benchmarks.asgi.request``.
+"""
+import asyncio
+from urllib.parse import urlsplit
+
+
+class HTTPClient:
+    def __init__(self, base_url: str, connections: int):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("Only plain http:// targets are supported")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(connections)
+
+    async def request(self, method: str, url: str, headers: dict | None = None, body: bytes = b""):
+        async with self._slots:
+            try:
+                reader, writer = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                result = await self._roundtrip(reader, writer, method, url, headers or {}, body)
+            except BaseException:
+                writer.close()
+                raise
+            if result[3]:
+                self._idle.put_nowait((reader, writer))
+            else:
+                writer.close()
+            return result[:3]
+
+    async def _roundtrip(self, reader, writer, method, url, headers, body):
+        lines = [f"{method} {self.prefix}{url} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = []
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers.append((name.strip().lower().encode(), value.strip().encode()))
+        fields = dict(response_headers)
+
+        if method == "HEAD" or status < 200 or status in (204, 304):
+            payload = b""
+        elif fields.get(b"transfer-encoding", b"").lower() == b"chunked":
+            chunks = []
+            while (size := int((await reader.readline()).split(b";")[0], 16)):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            await reader.readline()
+            payload = b"".join(chunks)
+        elif b"content-length" in fields:
+            payload = await reader.readexactly(int(fields[b"content-length"]))
+        else:
+            payload = await reader.read()
+            return status, response_headers, payload, False
+        keep_alive = fields.get(b"connection", b"").lower() != b"close"
+        return status, response_headers, payload, keep_alive
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            _, writer = self._idle.get_nowait()
+            writer.close()
@@ -0,0 +1,314 @@
+"""Scenario load runner with p50/p95/p99 and throughput as JSON.
+
+Drives one scenario with ``--concurrency`` workers for ``--duration``
+seconds (after ``--warmup`` seconds whose samples are dropped) and prints
+one JSON object; ``--output`` also appends it to a JSON-lines file so runs
+can be compared with ``benchmarks.compare``. Scenarios:
+
+    feed      public feed across filter/search/projection combinations
+    deep      deep offsets and long cursor walks through the feed
+    login     bursts of POST /auth/login (Argon2 bound)
+    crud      create, read, update and delete a recipe
+    upload    photo uploads (every body is distinct, so nothing is deduplicated)
+
+``--transport asgi`` (default) runs the app in this process against
+``--database-url``, seeding it first when ``--seed-recipes`` is given or
+no URL is passed. ``--transport http`` targets a running server at
+``--base-url`` whose database was seeded with ``benchmarks.seed``. Run
+from ``backend/``:
+
+    python -m benchmarks.load --scenario feed --seed-recipes 200000 --concurrency 50
+    python -m benchmarks.load --scenario login --transport http --base-url http://127.0.0.1:8000 --users 100000
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.common import percentile
+
+FEED_QUERIES = [
+    "/feed?limit=20",
+    "/feed?limit=20&cuisine=Italian",
+    "/feed?limit=20&cuisine=Peruvian",
+    "/feed?limit=20&max_cook_time=30",
+    "/feed?limit=20&min_rating=4",
+    "/feed?limit=20&max_calories=600&min_protein=30",
+    "/feed?limit=20&q=chicken",
+    "/feed?limit=20&q=spicy%20curry&cuisine=Indian",
+    "/feed?limit=50&fields=id,title,cuisine,rating",
+    "/feed?limit=20&cuisine=Mexican&max_cook_time=45&min_rating=3",
+]
+IMAGE_POOL = 8
+
+
+class Run:
+    """Shared state of one scenario run: the client, samples and errors."""
+
+    def __init__(self, client, users: int, rng: random.Random, deep_offset: int, walk_pages: int):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.deep_offset = deep_offset
+        self.walk_pages = walk_pages
+        self.recording = False
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.tokens: list[dict] = []
+        self.images: list[bytes] = []
+
+    async def call(self, label, method, url, headers=None, body=b"", expect=(200,)):
+        start = time.perf_counter()
+        try:
+            status, _, payload = await self.client.request(method, url, headers, body)
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            status, payload = type(exc).__name__, b""
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.samples[label].append(elapsed)
+            if status not in expect:
+                self.errors[f"{label} {status}"] += 1
+        return status, payload
+
+    async def login(self, user: int) -> tuple[int, bytes]:
+        from benchmarks.seed import BENCH_PASSWORD
+
+        body = json.dumps({"email": f"user{user}@example.com", "password": BENCH_PASSWORD}).encode()
+        return await self.call("login", "POST", "/auth/login", {"content-type": "application/json"}, body)
+
+    def auth(self, worker: int) -> dict:
+        return self.tokens[worker % len(self.tokens)]
+
+
+def recipe_body(rng: random.Random) -> bytes:
+    return json.dumps({
+        "title": f"Bench recipe {rng.randrange(1_000_000)}",
+        "cuisine": rng.choice(["Italian", "Mexican", "Thai"]),
+        "cook_time": rng.randrange(5, 120),
+        "is_public": rng.random() < 0.7,
+        "calories": rng.randrange(150, 1200),
+    }).encode()
+
+
+def multipart(field: str, filename: str, content_type: str, data: bytes) -> tuple[bytes, str]:
+    boundary = f"bench{random.getrandbits(64):x}"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def make_images(count: int, rng: random.Random) -> list[bytes]:
+    from PIL import Image
+
+    images = []
+    for _ in range(count):
+        image = Image.new("RGB", (800, 600), tuple(rng.randrange(256) for _ in range(3)))
+        image.putpixel((0, 0), tuple(rng.randrange(256) for _ in range(3)))
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=85)
+        images.append(out.getvalue())
+    return images
+
+
+# ---------- Scenarios: one iteration each, ``state`` is per worker ----------
+async def feed(run: Run, worker: int, state: dict) -> None:
+    await run.call("feed", "GET", run.rng.choice(FEED_QUERIES))
+
+
+async def deep(run: Run, worker: int, state: dict) -> None:
+    if run.rng.random() < 0.5:
+        offset = run.rng.randrange(0, run.deep_offset, 20)
+        await run.call("feed offset", "GET", f"/feed?limit=20&offset={offset}")
+        return
+    url = "/feed?limit=20" + (f"&cursor={state['cursor']}" if state.get("cursor") else "")
+    status, payload = await run.call("feed cursor", "GET", url)
+    state["pages"] = state.get("pages", 0) + 1
+    cursor = json.loads(payload)["meta"]["next_cursor"] if status == 200 else None
+    state["cursor"] = cursor if state["pages"] < run.walk_pages else None
+    if state["cursor"] is None:
+        state["pages"] = 0
+
+
+async def login(run: Run, worker: int, state: dict) -> None:
+    await run.login(run.rng.randrange(1, run.users + 1))
+
+
+async def crud(run: Run, worker: int, state: dict) -> None:
+    headers = {**run.auth(worker), "content-type": "application/json"}
+    status, payload = await run.call("create", "POST", "/recipes", headers, recipe_body(run.rng))
+    if status != 200:
+        return
+    recipe_id = json.loads(payload)["id"]
+    await run.call("get", "GET", f"/recipes/{recipe_id}", headers)
+    await run.call("update", "PUT", f"/recipes/{recipe_id}", headers, recipe_body(run.rng))
+    await run.call("delete", "DELETE", f"/recipes/{recipe_id}", headers)
+
+
+async def upload(run: Run, worker: int, state: dict) -> None:
+    if "recipe_id" not in state:
+        headers = {**run.auth(worker), "content-type": "application/json"}
+        _, _, payload = await run.client.request("POST", "/recipes", headers, recipe_body(run.rng))
+        state["recipe_id"] = json.loads(payload)["id"]
+    # bytes after the JPEG end marker are ignored by decoders but change the content hash
+    data = run.images[run.rng.randrange(len(run.images))] + run.rng.randbytes(16)
+    body, content_type = multipart("file", "photo.jpg", "image/jpeg", data)
+    headers = {**run.auth(worker), "content-type": content_type}
+    await run.call("photo", "POST", f"/recipes/{state['recipe_id']}/photo", headers, body)
+
+
+SCENARIOS = {"feed": feed, "deep": deep, "login": login, "crud": crud, "upload": upload}
+
+
+async def prepare(run: Run, scenario: str, concurrency: int) -> None:
+    if scenario in ("crud", "upload"):
+        # a few real logins, shared round-robin by the workers
+        for user in range(1, min(concurrency, 16, run.users) + 1):
+            status, payload = await run.login(user)
+            if status != 200:
+                raise SystemExit(f"Login as user{user} failed ({status}); was the database seeded?")
+            run.tokens.append({"authorization": f"Bearer {json.loads(payload)['access_token']}"})
+    if scenario == "upload":
+        run.images = make_images(IMAGE_POOL, run.rng)
+
+
+async def drive(run: Run, scenario: str, concurrency: int, warmup: float, duration: float) -> float:
+    step = SCENARIOS[scenario]
+    await prepare(run, scenario, concurrency)
+    warm_until = time.perf_counter() + warmup
+    stop_at = warm_until + duration
+    started = None
+
+    async def worker(index: int):
+        nonlocal started
+        state: dict = {}
+        while (now := time.perf_counter()) < stop_at:
+            if not run.recording and now >= warm_until:
+                run.recording, started = True, now
+            await step(run, index, state)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return time.perf_counter() - (started or stop_at)
+
+
+def summarize(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def report(args, run: Run, elapsed: float, target: str, revision: str | None) -> dict:
+    every = [s for samples in run.samples.values() for s in samples]
+    errors = sum(run.errors.values())
+    return {
+        "scenario": args.scenario,
+        "transport": args.transport,
+        "target": target,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(every),
+        "errors": errors,
+        "rps": round(len(every) / elapsed, 2) if elapsed else 0.0,
+        **{k: v for k, v in summarize(every).items() if k != "count"},
+        "endpoints": {label: summarize(samples) for label, samples in sorted(run.samples.items())},
+        "error_counts": dict(run.errors),
+        "revision": revision,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def asgi_client(args):
+    db_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_load.db')}"
+    # before anything imports app.core.config
+    os.environ["DATABASE_URL"] = db_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("DB_POOL_SIZE", str(args.concurrency))
+    if args.database_url is None or args.seed_recipes:
+        from sqlalchemy import create_engine
+
+        from benchmarks.seed import seed
+
+        engine = create_engine(db_url)
+        seed(engine, args.users, args.seed_recipes or 20_000)
+        engine.dispose()
+    # uploads land in a scratch directory, not the working tree
+    os.chdir(tempfile.mkdtemp())
+    os.makedirs("uploads")
+
+    from app.main import app
+    from benchmarks.asgi import request
+
+    class Client:
+        async def request(self, method, url, headers=None, body=b""):
+            return await request(app, method, url, headers, body)
+
+    return Client(), db_url.split("://")[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), required=True)
+    parser.add_argument("--transport", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--database-url")
+    parser.add_argument("--seed-recipes", type=int, default=0)
+    parser.add_argument("--users", type=int, default=1_000, help="seeded users to log in as")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--deep-offset", type=int, default=10_000)
+    parser.add_argument("--walk-pages", type=int, default=200)
+    parser.add_argument("--rng-seed", type=int, default=0)
+    parser.add_argument("--output", help="append the result to this JSON-lines file")
+    args = parser.parse_args()
+    # the ASGI transport changes directory, so resolve these first
+    output = os.path.abspath(args.output) if args.output else None
+    revision = git_revision()
+
+    async def go() -> dict:
+        if args.transport == "http":
+            from benchmarks.httpclient import HTTPClient
+
+            client, target = HTTPClient(args.base_url, args.concurrency), args.base_url
+        else:
+            client, target = asgi_client(args)
+        run = Run(client, args.users, random.Random(args.rng_seed), args.deep_offset, args.walk_pages)
+        elapsed = await drive(run, args.scenario, args.concurrency, args.warmup, args.duration)
+        if args.transport == "http":
+            await client.close()
+        return report(args, run, elapsed, target, revision)
+
+    result = asyncio.run(go())
+    line = json.dumps(result)
+    print(line)
+    if output:
+        with open(output, "a") as f:
+            f.write(line + "\n")
+    if result["requests"] and result["errors"] == result["requests"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
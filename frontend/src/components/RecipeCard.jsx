@@ -1,7 +1,9 @@
 import { Link } from "react-router-dom";
 
 export default function RecipeCard({ recipe, showActions = false, onDelete }) {
-  const { id, title, rating, calories, protein_g, cook_time, review, is_public } = recipe;
+  const { id, title, rating, calories, protein_g, cook_time, is_public } = recipe;
+  // list endpoints send a short review_excerpt instead of the full review
+  const review = recipe.review_excerpt ?? recipe.review;
 
   const ratingDisplay = rating ? `${"🍽️".repeat(Math.round(rating))}` : "No rating";
 